@@ -12,8 +12,7 @@ def main():
 
     for key in keys:
         print(f"Adding: {key}")
-        h1 = cuckoo.hash1.hash(key) % cuckoo.size
-        h2 = cuckoo.hash2.hash(key) % cuckoo.size
+        h1, h2 = cuckoo.positions(key)
         print(f"h1: {h1}, h2: {h2}")
 
         displaced = key
@@ -21,7 +20,7 @@ def main():
 
         for i in range(cuckoo.max_displacements):
             if current_table == 1:
-                pos = cuckoo._position(displaced, 1)
+                pos = cuckoo.positions(displaced)[0]
                 if cuckoo.table1[pos] is None:
                     cuckoo.table1[pos] = displaced
                     print(f"Inserted {displaced} at position table1[{pos}]")
@@ -30,7 +29,7 @@ def main():
                 displaced, cuckoo.table1[pos] = cuckoo.table1[pos], displaced
                 current_table = 2
             else:
-                pos = cuckoo._position(displaced, 2)
+                pos = cuckoo.positions(displaced)[1]
                 if cuckoo.table2[pos] is None:
                     cuckoo.table2[pos] = displaced
                     print(f"Inserted {displaced} at position table2[{pos}]")
@@ -44,6 +43,7 @@ def main():
         show_tables(cuckoo.table1, cuckoo.table2)
 
     print("Membership checks:")
+    cuckoo.enable_stats()
     test_keys = ["ariana", "camila", "diego", "akira", "sandro", "alfredo", "amir", "albert", "omar", "luis"]
     for key in test_keys:
         result = cuckoo.contains(key)
@@ -53,6 +53,10 @@ def main():
     print("\nFinal state of tables:")
     show_tables(cuckoo.table1, cuckoo.table2)
 
+    print("Operation stats:")
+    for name, value in cuckoo.stats().items():
+        print(f"  {name}: {value}")
+
 if __name__ == "__main__":
     main()
 
@@ -1,67 +1,79 @@
-from os import urandom
-from structures.tabulated_bloom_filter import BloomFilter
+"""Driver comparing the empirical and theoretical false positive rates of the Bloom filter.
+
+The filter is filled up to its capacity in 10 steps and, after each step,
+queried with 100000 keys that were never inserted. Every configuration is
+repeated over several seeds in parallel (structures.false_positive) and the
+empirical rate is plotted with its 95% confidence interval.
+
+A sweep over tolerance, capacity and hasher family is saved as CSV. The results are saved
+in statistics/
+"""
+import os
+import argparse
 import matplotlib.pyplot as plt
+from structures.false_positive import sweep, bloom_factory
 
-# Lists to collect plotting data
-empirical_rates = []
-theoretical_rates = []
-inserted_counts = []
+OUTPUT_DIR = "statistics"
 
+CAPACITY = 1000
+TOLERANCE = 0.01
+SWEEP_CAPACITIES = [1000, 10000, 100000]
+SWEEP_TOLERANCES = [0.1, 0.05, 0.01, 0.001]
+SWEEP_FAMILIES = ["simple", "twisted", "double", "mixed"]
 
-# Tracking statistics
-false_positives = 0
-test_queries_per_batch = 100000
-added_items = []
-batch_size = 100
-bf_size = 1000
-queries = 0
 
-# Initialize Bloom filter
-bf = BloomFilter(max_size=bf_size, max_tolerance=0.01, seed=42)
+def plot_rates(rows, file_name):
+    inserted_counts = [row["inserted"] for row in rows]
+    empirical_rates = [row["empirical_fpr"] for row in rows]
+    theoretical_rates = [row["theoretical_fpr"] for row in rows]
+    errors = [[row["empirical_fpr"] - row["ci_low"] for row in rows],
+              [row["ci_high"] - row["empirical_fpr"] for row in rows]]
 
-# Run until 1000 unique elements have been inserted
-while len(added_items) < bf_size:
-    # Insert 100 pseudorandom 8-byte items
-    for _ in range(batch_size):
-        item = urandom(8)
-        added_items.append(item)
-        bf.add(item)
+    x = range(len(inserted_counts))
+    width = 0.35
 
-    # Query 100000 fresh random items not inserted
-    for _ in range(test_queries_per_batch):
-        test_item = urandom(8)
-        while test_item in added_items:
-            test_item = urandom(8)
-        if bf.contains(test_item):
-            false_positives += 1
+    plt.figure(figsize=(12, 6))
+    plt.bar([i - width/2 for i in x], empirical_rates, width=width, yerr=errors, capsize=3,
+            label='Empirical FPR (95% CI)')
+    plt.bar([i + width/2 for i in x], theoretical_rates, width=width, label='Theoretical FPR')
 
-    empirical_fpr = false_positives / test_queries_per_batch
-    theoretical_fpr = bf.false_positive_probability()
+    plt.xticks(ticks=x, labels=inserted_counts)
+    plt.xlabel("Items Inserted")
+    plt.ylabel("False Positive Rate")
+    plt.title("Comparison of Empirical vs Theoretical False Positive Rates")
+    plt.legend()
+    plt.grid(axis="y", linestyle="--", alpha=0.5)
+    plt.tight_layout()
+    plt.savefig(os.path.join(OUTPUT_DIR, file_name), dpi=300)
+    plt.close()
+    print(f"Saved plot to {file_name}")
 
-    print(f"\nItems inserted so far: {len(added_items)}")
-    print(f"Empirical false positive rate: {empirical_fpr:.6f}")
-    print(f"Theoretical false positive rate: {theoretical_fpr:.6f}")
 
-    inserted_counts.append(len(added_items))
-    empirical_rates.append(empirical_fpr)
-    theoretical_rates.append(theoretical_fpr)
+def main():
+    parser = argparse.ArgumentParser(description="Bloom filter false positive rate experiments")
+    parser.add_argument("--seeds", type=int, default=10)
+    parser.add_argument("--queries", type=int, default=100000)
+    parser.add_argument("--workers", type=int, default=None, help="processes to use (default: all CPUs)")
+    parser.add_argument("--sweep", action="store_true", help="also sweep tolerance, capacity and hasher family")
+    args = parser.parse_args()
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-    false_positives = 0
+    rows = sweep({"bloom": bloom_factory}, capacities=[CAPACITY], tolerances=[TOLERANCE],
+                 seeds=range(args.seeds), num_queries=args.queries, workers=args.workers)
+    for row in rows:
+        print(f"\nItems inserted so far: {row['inserted']}")
+        print(f"Empirical false positive rate: {row['empirical_fpr']:.6f} "
+              f"[{row['ci_low']:.6f}, {row['ci_high']:.6f}]")
+        print(f"Theoretical false positive rate: {row['theoretical_fpr']:.6f}")
+    plot_rates(rows, "false_positive_rates_bf_comparison.png")
 
-# Plotting
-x = range(len(inserted_counts))
-width = 0.35
+    if args.sweep:
+        csv_path = os.path.join(OUTPUT_DIR, "false_positive_rates_sweep.csv")
+        sweep({"bloom": bloom_factory}, capacities=SWEEP_CAPACITIES, tolerances=SWEEP_TOLERANCES,
+              families=SWEEP_FAMILIES, seeds=range(args.seeds), num_queries=args.queries, fill_steps=1,
+              workers=args.workers, csv_path=csv_path)
+        print(f"Saved sweep to {csv_path}")
 
-plt.figure(figsize=(12, 6))
-plt.bar([i - width/2 for i in x], empirical_rates, width=width, label='Empirical FPR')
-plt.bar([i + width/2 for i in x], theoretical_rates, width=width, label='Theoretical FPR')
 
-plt.xticks(ticks=x, labels=inserted_counts)
-plt.xlabel("Items Inserted")
-plt.ylabel("False Positive Rate")
-plt.title("Comparison of Empirical vs Theoretical False Positive Rates")
-plt.legend()
-plt.grid(axis="y", linestyle="--", alpha=0.5)
-plt.tight_layout()
-plt.savefig("statistics/false_positive_rates_bf_comparison.png", dpi=300)
-print("Saved plot to false_positive_rates_comparison.png")
+if __name__ == "__main__":
+    main()
@@ -15,15 +15,15 @@ def main():
     elements_to_add = ["apple", "banana", "cherry", "date", "fig"]
     elements_to_check = ["apple", "banana", "grape", "kiwi", "fig"]
 
-    bf = BloomFilter(max_size=10, max_tolerance=0.01, seed=123)
+    bf = BloomFilter(max_size=10, max_tolerance=0.01, seed=123).enable_stats()
     print("Initial bit array:")
-    print(display_bits(bf._bits, bf._num_bits))
+    print(display_bits(bf.bits, bf.num_bits))
     print()
 
     for el in elements_to_add:
         print(f"Adding: {el}")
         bf.add(el)
-        print(display_bits(bf._bits, bf._num_bits))
+        print(display_bits(bf.bits, bf.num_bits))
         print()
 
     print("Membership checks:")
@@ -32,10 +32,14 @@ def main():
         print(f"{el:>8}: {'Possibly in set' if result else 'Definitely not in set'}")
 
     print("\nFinal bit array:")
-    print(display_bits(bf._bits, bf._num_bits))
+    print(display_bits(bf.bits, bf.num_bits))
     print(f"\nApproximate number of items inserted: {bf.size}")
     print(f"Estimated false positive probability: {bf.false_positive_probability():.6f}")
     print(f"Confidence (1 - false positive rate): {bf.confidence():.6f}")
 
+    print("\nOperation stats:")
+    for name, value in bf.stats().items():
+        print(f"  {name}: {value}")
+
 if __name__ == "__main__":
     main()
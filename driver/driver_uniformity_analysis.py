@@ -2,6 +2,7 @@
 - Simple Tabulation Hash
 - Twisted Tabulation Hash
 - Double Tabulation Hash
+- Mixed Tabulation Hash
 
 It is expected that these hashes follow a closely uniform distribution.
 To check this, Pearson's chi-squared test (implementend in scipy.stats) is used.
@@ -19,70 +20,86 @@ In other words, on average the chi-squared statistic should be in the range of N
 The p-value shouldn't fall under 0.05. If it falls it indicates the data might not be
 uniformly distributed.
 
+The runs themselves are computed by tabulation_hashes.uniformity, which also
+reports bit bias, avalanche and pairwise-collision statistics. Each family is
+streamed to its own CSV first and plotted from that CSV afterwards, so
+plotting can be repeated with --plot-only without hashing again.
+
 The results are saved in statistics/
 """
-from os import urandom
-from tabulation_hashes import TabulationHash, DoubleTabulationHash, TwistedTabulationHash
-from scipy.stats import chisquare
+import argparse
+import os
+import pandas as pd
+from tabulation_hashes import TabulationHash, DoubleTabulationHash, TwistedTabulationHash, MixedTabulationHash
+from tabulation_hashes.uniformity import run_analysis, NUM_RUNS, SAMPLE_SIZE, NUM_BUCKETS
 import matplotlib.pyplot as plt
 
-NUM_RUNS = 100
-SAMPLE_SIZE = 100000
-NUM_BUCKETS = 1000
+OUTPUT_DIR = "statistics"
+
+# family, hash class, title
+FAMILIES = [
+    ("simple_tabulation", TabulationHash, "Tabulation Hashing"),
+    ("double_tabulation", DoubleTabulationHash, "Double Tabulation"),
+    ("twisted_tabulation", TwistedTabulationHash, "Twisted Tabulation"),
+    ("mixed_tabulation", MixedTabulationHash, "Mixed Tabulation"),
+]
 
 
 def plot_stats(stats, pvals, file_name, title):
+    num_runs = len(stats)
     # Plotting
     fig, axs = plt.subplots(1, 2, figsize=(12, 5))
 
     # Chi-square statistics
-    axs[0].plot(range(1, NUM_RUNS + 1), stats, marker='o', linestyle='-')
+    axs[0].plot(range(1, num_runs + 1), stats, marker='o', linestyle='-')
     axs[0].axhline(y=NUM_BUCKETS - 1, color='red', linestyle='--', label=f'Expected (df={NUM_BUCKETS-1})')
-    axs[0].set_title(f"Chi-Square Statistics ({NUM_RUNS} runs)")
+    axs[0].set_title(f"Chi-Square Statistics ({num_runs} runs)")
     axs[0].set_xlabel("Run")
     axs[0].set_ylabel("Chi-Square Statistic")
     axs[0].legend()
 
     # p-values
-    axs[1].plot(range(1, NUM_RUNS + 1), pvals, marker='o', linestyle='-')
+    axs[1].plot(range(1, num_runs + 1), pvals, marker='o', linestyle='-')
     axs[1].axhline(y=0.05, color='red', linestyle='--', label='Significance Threshold (0.05)')
-    axs[1].set_title(f"p-Values ({NUM_RUNS} Runs)")
+    axs[1].set_title(f"p-Values ({num_runs} Runs)")
     axs[1].set_xlabel("Run")
     axs[1].set_ylabel("p-Value")
     axs[1].legend()
 
     fig.suptitle(f"Uniformity Test of {title}", fontsize=16)
     plt.tight_layout()
-    plt.savefig(f"statistics/{file_name}", dpi=300)
+    plt.savefig(os.path.join(OUTPUT_DIR, file_name), dpi=300)
+    plt.close(fig)
     print(f"Plot saved as {file_name}")
 
-def get_stats(hash_class):
-    stats = []
-    pvals = []
-
-    for _ in range(NUM_RUNS):
-        buckets = [0] * NUM_BUCKETS
-        h = hash_class()
+def csv_path(family):
+    return os.path.join(OUTPUT_DIR, f"{family}_uniformity_analysis.csv")
 
-        for _ in range(SAMPLE_SIZE):
-            s = urandom(8)
-            idx = h.hash(s) % NUM_BUCKETS
-            buckets[idx] += 1
+def get_stats(hash_class, family, runs=NUM_RUNS, sample_size=SAMPLE_SIZE, workers=None):
+    run_analysis(hash_class, runs=runs, workers=workers, csv_path=csv_path(family),
+                 sample_size=sample_size, num_buckets=NUM_BUCKETS, family=family)
 
-        stat, p = chisquare(buckets)
-        stats.append(stat)
-        pvals.append(p)
-    return stats, pvals
+def plot_family(family, title):
+    df = pd.read_csv(csv_path(family))
+    plot_stats(df["chi2"], df["p_value"], f"{family}_uniformity_analysis.png", title)
+    print(f"  {title}: p < 0.05 in {(df['p_value'] < 0.05).mean():.0%} of runs, "
+          f"max bit bias {df['max_bit_bias'].max():.4f}, "
+          f"max avalanche bias {df['avalanche_max_bias'].max():.4f}, "
+          f"mean collision ratio {df['collision_ratio'].mean():.3f}")
 
 def main():
-    stats, pvals = get_stats(TabulationHash)
-    plot_stats(stats, pvals, "simple_tabulation_uniformity_analysis.png", "Tabulation Hashing")
-
-    stats, pvals = get_stats(DoubleTabulationHash)
-    plot_stats(stats, pvals, "double_tabulation_uniformity_analysis.png", "Double Tabulation")
-
-    stats, pvals = get_stats(TwistedTabulationHash)
-    plot_stats(stats, pvals, "twisted_tabulation_uniformity_analysis.png", "Twisted Tabulation")
+    parser = argparse.ArgumentParser(description="Uniformity analysis of the tabulation hashes")
+    parser.add_argument("--runs", type=int, default=NUM_RUNS)
+    parser.add_argument("--sample-size", type=int, default=SAMPLE_SIZE)
+    parser.add_argument("--workers", type=int, default=None, help="processes to use (default: all CPUs)")
+    parser.add_argument("--plot-only", action="store_true", help="plot the existing CSVs without hashing")
+    args = parser.parse_args()
+
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    for family, hash_class, title in FAMILIES:
+        if not args.plot_only:
+            get_stats(hash_class, family, args.runs, args.sample_size, args.workers)
+        plot_family(family, title)
 
 if __name__ == '__main__':
     main()
@@ -0,0 +1,227 @@
+"""Low-overhead benchmark suite for the hashes and structures.
+
+Each benchmark times a whole batch of operations per trial instead of single
+calls, so timer and profiler overhead is amortised over the batch. Trials are
+preceded by warmup runs, the garbage collector is paused while timing, and
+the per-operation time of every trial is summarised with its median and
+percentiles. Memory per key is measured with tracemalloc.
+
+Usage:
+    python -m profilers.benchmark run --output statistics/benchmark.json
+    python -m profilers.benchmark compare base.json new.json --threshold 0.10
+
+compare exits with status 1 if any benchmark got slower (or heavier) than the
+threshold allows.
+"""
+import argparse
+import gc
+import json
+import platform
+import random
+import sys
+import time
+import tracemalloc
+from typing import Callable, Dict, Iterable, List, Tuple
+import numpy as np
+from structures.cuckoo_hashing import CuckooHashTable
+from structures.tabulated_bloom_filter import BloomFilter
+from tabulation_hashes.families import FAMILIES
+
+NUM_KEYS = 20000
+TRIALS = 15
+WARMUP = 2
+PERCENTILES = (5, 25, 75, 95)
+
+HASHERS = FAMILIES
+
+# A case returns a fresh (operation, keys) pair for every trial; only the loop
+# `for key in keys: operation(key)` is timed.
+Case = Callable[[], Tuple[Callable, list]]
+
+
+def time_case(prepare: Case, trials: int = TRIALS, warmup: int = WARMUP) -> List[float]:
+    """Returns the per-operation time in seconds of each timed trial."""
+    samples = []
+    for trial in range(warmup + trials):
+        op, keys = prepare()
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            start = time.perf_counter_ns()
+            for key in keys:
+                op(key)
+            elapsed = time.perf_counter_ns() - start
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+        if trial >= warmup:
+            samples.append(elapsed / len(keys) / 1e9)
+    return samples
+
+
+def summarize(samples: List[float]) -> Dict[str, float]:
+    values = np.asarray(samples)
+    summary = {
+        "median_s": float(np.median(values)),
+        "mean_s": float(values.mean()),
+        "min_s": float(values.min()),
+        "stdev_s": float(values.std(ddof=1)) if len(values) > 1 else 0.0,
+    }
+    for p in PERCENTILES:
+        summary[f"p{p}_s"] = float(np.percentile(values, p))
+    return summary
+
+
+def memory_per_key(build: Callable[[list], object], keys: list) -> float:
+    """Bytes allocated by build(keys) divided by the number of keys."""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        structure = build(keys)
+        allocated, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    del structure
+    return allocated / len(keys)
+
+
+def random_keys(n: int, seed: int) -> List[int]:
+    rng = random.Random(seed)
+    return [rng.getrandbits(32) for _ in range(n)]
+
+
+def build_bloom(keys: list) -> BloomFilter:
+    bf = BloomFilter(max_size=len(keys), max_tolerance=0.01, seed=1)
+    for key in keys:
+        bf.add(key)
+    return bf
+
+
+def build_cuckoo(keys: list) -> CuckooHashTable:
+    # Load factor 0.4 over both tables
+    table = CuckooHashTable(size=int(len(keys) / 0.8) + 1, max_displacements=50)
+    for key in keys:
+        table.insert(key)
+    return table
+
+
+def benchmark_cases(n: int) -> Iterable[Tuple[str, Case]]:
+    keys = random_keys(n, seed=1)
+    misses = random_keys(n, seed=2)
+
+    for name, hash_class in HASHERS.items():
+        hasher = hash_class(seed=3)
+        yield f"hash.{name}", lambda h=hasher: (h.hash, keys)
+
+    bf = build_bloom(keys)
+    yield "bloom.add", lambda: (BloomFilter(max_size=n, max_tolerance=0.01, seed=1).add, keys)
+    yield "bloom.contains_hit", lambda: (bf.contains, keys)
+    yield "bloom.contains_miss", lambda: (bf.contains, misses)
+
+    table = build_cuckoo(keys)
+    yield "cuckoo.insert", lambda: (CuckooHashTable(size=int(n / 0.8) + 1, max_displacements=50).insert, keys)
+    yield "cuckoo.contains_hit", lambda: (table.contains, keys)
+    yield "cuckoo.contains_miss", lambda: (table.contains, misses)
+
+
+def run(n: int = NUM_KEYS, trials: int = TRIALS, warmup: int = WARMUP, name_filter: str = None) -> dict:
+    results = []
+    for name, prepare in benchmark_cases(n):
+        if name_filter and name_filter not in name:
+            continue
+        entry = {"name": name, "unit": "s/op", "num_ops": n, "trials": trials}
+        entry.update(summarize(time_case(prepare, trials, warmup)))
+        results.append(entry)
+        print(f"{name:>22}: median {entry['median_s'] * 1e6:8.3f} us/op  "
+              f"p95 {entry['p95_s'] * 1e6:8.3f} us/op", file=sys.stderr)
+
+    keys = random_keys(n, seed=1)
+    for name, build in (("bloom.memory", build_bloom), ("cuckoo.memory", build_cuckoo)):
+        if name_filter and name_filter not in name:
+            continue
+        per_key = memory_per_key(build, keys)
+        results.append({"name": name, "unit": "bytes/key", "num_keys": n, "median_s": None,
+                        "bytes_per_key": per_key})
+        print(f"{name:>22}: {per_key:8.2f} bytes/key", file=sys.stderr)
+
+    return {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "num_keys": n,
+            "trials": trials,
+            "warmup": warmup,
+        },
+        "results": results,
+    }
+
+
+def _metric(entry: dict) -> float:
+    return entry["bytes_per_key"] if entry["unit"] == "bytes/key" else entry["median_s"]
+
+
+def compare(base: dict, new: dict, threshold: float = 0.10) -> List[dict]:
+    """
+    Compares the median (or bytes per key) of every benchmark present in both
+    result sets. A benchmark regresses when new > base * (1 + threshold).
+    """
+    base_by_name = {entry["name"]: entry for entry in base["results"]}
+    rows = []
+    for entry in new["results"]:
+        old = base_by_name.get(entry["name"])
+        if old is None or old["unit"] != entry["unit"]:
+            continue
+        before, after = _metric(old), _metric(entry)
+        change = (after - before) / before if before else 0.0
+        rows.append({
+            "name": entry["name"],
+            "unit": entry["unit"],
+            "base": before,
+            "new": after,
+            "change": change,
+            "regression": change > threshold,
+        })
+    return rows
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = sub.add_parser("run", help="run the benchmark suite")
+    run_parser.add_argument("--output", default="statistics/benchmark.json")
+    run_parser.add_argument("--keys", type=int, default=NUM_KEYS, help="operations per trial")
+    run_parser.add_argument("--trials", type=int, default=TRIALS)
+    run_parser.add_argument("--warmup", type=int, default=WARMUP)
+    run_parser.add_argument("--filter", dest="name_filter", help="only run benchmarks containing this text")
+
+    compare_parser = sub.add_parser("compare", help="flag regressions between two result files")
+    compare_parser.add_argument("base")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.10,
+                                help="relative slowdown tolerated before flagging (default: 0.10)")
+
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        report = run(args.keys, args.trials, args.warmup, args.name_filter)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"Saved results to {args.output}", file=sys.stderr)
+        return 0
+
+    with open(args.base) as f:
+        base = json.load(f)
+    with open(args.new) as f:
+        new = json.load(f)
+    rows = compare(base, new, args.threshold)
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else ""
+        print(f"{row['name']:>22}  {row['base']:.4g} -> {row['new']:.4g} {row['unit']:<9} "
+              f"{row['change']:+7.1%}  {flag}")
+    return 1 if any(row["regression"] for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,118 @@
+"""Load test of the membership server over localhost.
+
+Builds a BloomFilter and a CuckooHashTable of NUM_KEYS keys, starts
+structures.server on them in a separate process and drives it with a
+MembershipClient: for every concurrency level, that many coroutines issue
+contains() calls on random integer keys (half hits) for DURATION seconds, timing each call. A last
+case sends the same queries pipelined through contains_many(). Throughput
+(QPS) and latency percentiles are printed and saved in statistics/.
+
+Usage:
+    python -m profilers.load_test_server [--unix]
+"""
+import argparse
+import asyncio
+import csv
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import numpy as np
+from structures.client import MembershipClient
+from structures.cuckoo_hashing import CuckooHashTable
+from structures.tabulated_bloom_filter import BloomFilter
+
+OUTPUT_DIR = "statistics"
+os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+LOAD_TEST_CSV = os.path.join(OUTPUT_DIR, "server_load_test.csv")
+
+NUM_KEYS = 100000
+CONCURRENCY = [1, 16, 64, 256]
+DURATION = 3.0
+PIPELINE_BATCH = 1000
+POOL_SIZE = 4
+
+def free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+def start_server(workdir: str, keys: list, unix: bool):
+    bf = BloomFilter(max_size=len(keys), max_tolerance=0.01, seed=1)
+    bf.add_many(keys)
+    bf.save(os.path.join(workdir, "keys.bf"))
+    CuckooHashTable.from_keys(keys).save(os.path.join(workdir, "keys.cuckoo"))
+
+    address = ["--unix", os.path.join(workdir, "membership.sock")] if unix else ["--port", str(free_port())]
+    process = subprocess.Popen(
+        [sys.executable, "-m", "structures.server", "--bloom", f"bloom={workdir}/keys.bf",
+         "--cuckoo", f"cuckoo={workdir}/keys.cuckoo", *address],
+        stdout=subprocess.PIPE, text=True)
+    process.stdout.readline()  # Wait until it is listening
+    return process, address
+
+async def worker(client, structure, queries, deadline, latencies):
+    contains = client.contains
+    while time.perf_counter() < deadline:
+        key = random.choice(queries)
+        start = time.perf_counter()
+        await contains(structure, key)
+        latencies.append(time.perf_counter() - start)
+
+async def pipelined(client, structure, queries, deadline, latencies):
+    while time.perf_counter() < deadline:
+        batch = random.sample(queries, PIPELINE_BATCH)
+        start = time.perf_counter()
+        await client.contains_many(structure, batch)
+        latencies.extend([(time.perf_counter() - start) / PIPELINE_BATCH] * PIPELINE_BATCH)
+
+async def run_case(client_args, structure, queries, concurrency, mode):
+    latencies = []
+    async with MembershipClient(pool_size=POOL_SIZE, **client_args) as client:
+        deadline = time.perf_counter() + DURATION
+        start = time.perf_counter()
+        run = worker if mode == "concurrent" else pipelined
+        await asyncio.gather(*(run(client, structure, queries, deadline, latencies) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {"structure": structure, "mode": mode, "concurrency": concurrency, "requests": len(latencies),
+            "qps": len(latencies) / elapsed, "p50_s": p50, "p95_s": p95, "p99_s": p99}
+
+def load_test(unix: bool = False):
+    # Integer keys: str keys only differ to the hashes in their last 4 bytes
+    rng = random.Random(1)
+    unique = list({rng.getrandbits(62) for _ in range(2 * NUM_KEYS + 1000)})
+    keys, misses = unique[:NUM_KEYS], unique[NUM_KEYS:2 * NUM_KEYS]
+    queries = keys[:NUM_KEYS // 2] + misses[:NUM_KEYS // 2]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        process, address = start_server(workdir, keys, unix)
+        client_args = {"path": address[1]} if unix else {"port": int(address[1])}
+        try:
+            rows = []
+            for structure in ("bloom", "cuckoo"):
+                cases = [(c, "concurrent") for c in CONCURRENCY] + [(1, "pipelined")]
+                for concurrency, mode in cases:
+                    row = asyncio.run(run_case(client_args, structure, queries, concurrency, mode))
+                    rows.append(row)
+                    print(f"{structure:>7} {mode:>10} x{concurrency:<4} {row['qps']:>10,.0f} qps  "
+                          f"p50 {row['p50_s'] * 1e6:8.1f} us  p95 {row['p95_s'] * 1e6:8.1f} us  "
+                          f"p99 {row['p99_s'] * 1e6:8.1f} us")
+        finally:
+            process.terminate()
+            process.wait()
+
+    with open(LOAD_TEST_CSV, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0]))
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--unix", action="store_true", help="use a Unix socket instead of TCP")
+    load_test(parser.parse_args().unix)
@@ -1,93 +1,65 @@
-import cProfile
-import pstats
-import random
-import unittest
 import os
+import random
 from os import urandom
+import pandas as pd
+import matplotlib.pyplot as plt
 from structures.tabulated_bloom_filter import BloomFilter
+from profilers.benchmark import time_case
 
-if not os.path.exists('statistics'):
-    os.makedirs('statistics', exist_ok=True)
-
-class BloomFilterProfile(unittest.TestCase):
-    Sizes = [100, 200, 300, 400, 500, 1000, 2000, 3000, 4000, 5000, 6000, 7000, 8000, 9000, \
-             10000, 20000, 30000, 40000, 50000, 60000, 70000, 80000, 90000, 100000]
-    Runs = 1000  # Number of profiling runs for each method and size
-    OutputFileName = 'statistics/profile_bf.csv'
-
-    @staticmethod
-    def write_header(f) -> None:
-        f.write('test_case,filter_size,method_name,total_time,cumulative_time,per_call_time\n')
+OUTPUT_DIR = "statistics"
+os.makedirs(OUTPUT_DIR, exist_ok=True)
 
-    @staticmethod
-    def write_row(f, test_case: str, filter_size: int, method_name: str,
-                   total_time: float, cumulative_time: float, per_call_time: float) -> None:
-        f.write(f'{test_case},{filter_size},{method_name},{total_time},{cumulative_time},{per_call_time}\n')
+OUTPUT_CSV = os.path.join(OUTPUT_DIR, "profile_bf.csv")
 
-    @staticmethod
-    def get_running_times(st: pstats.Stats, method_name: str):
-        ps = st.strip_dirs().stats
+SIZES = [100, 200, 300, 400, 500, 1000, 2000, 3000, 4000, 5000, 6000, 7000, 8000, 9000,
+         10000, 20000, 30000, 40000, 50000, 60000, 70000, 80000, 90000, 100000]
+BATCH = 1000  # Operations timed together in each trial
+TRIALS = 15
 
-        def is_bf_method(k):
-            return method_name in k[2]
+def write_rows(f, filter_size: int, method_name: str, samples) -> None:
+    for trial, per_call_time in enumerate(samples):
+        f.write(f'bloom,{filter_size},{method_name},{trial},{per_call_time}\n')
 
-        keys = list(filter(is_bf_method, ps.keys()))
-        return [(key[2], ps[key][2], ps[key][3], ps[key][3] / ps[key][1]) for key in keys]
+def perfilado_bloom_filter():
+    with open(OUTPUT_CSV, 'w') as f:
+        f.write('test_case,filter_size,method_name,trial,per_call_time\n')
 
-    def test_profile_bloomfilter_add_and_contains(self) -> None:
-        with open(BloomFilterProfile.OutputFileName, 'w') as f:
-            BloomFilterProfile.write_header(f)
+        for size in SIZES:
+            seed = random.randint(1, 100)
+            bf = BloomFilter(max_size=size, max_tolerance=0.01, seed=seed)
+            keys = [urandom(8) for _ in range(BATCH)]
+            queries = [urandom(8) for _ in range(BATCH)]
 
-            for size in BloomFilterProfile.Sizes:
-                bf = BloomFilter(max_size=size, max_tolerance=0.01, seed=random.randint(1,100))
+            # Every trial inserts into a fresh, empty filter
+            new_filter = lambda: BloomFilter(max_size=size, max_tolerance=0.01, seed=seed)
+            write_rows(f, size, 'add', time_case(lambda: (new_filter().add, keys), TRIALS))
+            # Queries run against a filter holding the batch, as before
+            bf.add_many(keys)
+            write_rows(f, size, 'contains', time_case(lambda: (bf.contains, queries), TRIALS))
 
-                # Profile 'add' method
-                for _ in range(BloomFilterProfile.Runs):
-                    pro = cProfile.Profile()
-                    pro.runcall(bf.add, urandom(8))
-                    st = pstats.Stats(pro)
+    print("Perfilado completo: add y contains.")
 
-                    for method_name, total_time, cumulative_time, per_call_time in \
-                            BloomFilterProfile.get_running_times(st, 'add'):
-                        BloomFilterProfile.write_row(f, 'bloom', size, method_name,
-                                                     total_time, cumulative_time, per_call_time)
+def graficar():
+    data = pd.read_csv(OUTPUT_CSV)
 
-                # Profile 'contains' method
-                for _ in range(BloomFilterProfile.Runs):
-                    pro = cProfile.Profile()
-                    pro.runcall(bf.contains, urandom(8))
-                    st = pstats.Stats(pro)
-
-                    for method_name, total_time, cumulative_time, per_call_time in \
-                            BloomFilterProfile.get_running_times(st, 'contains'):
-                        BloomFilterProfile.write_row(f, 'bloom', size, method_name,
-                                                     total_time, cumulative_time, per_call_time)
-
-
-suite = unittest.TestLoader().loadTestsFromTestCase(BloomFilterProfile)
-unittest.TextTestRunner(verbosity=2).run(suite)
-
-import pandas as pd
-import matplotlib.pyplot as plt
+    # Group by filter size and method, median per-call time over the trials
+    median_times = data.groupby(["filter_size", "method_name"])["per_call_time"].median().unstack()
 
-# Load the CSV data
-data = pd.read_csv("statistics/profile_bf.csv")
+    plt.figure(figsize=(10, 6))
+    plt.plot(median_times.index, median_times["add"], marker='o', label="Add (median)")
+    plt.plot(median_times.index, median_times["contains"], marker='o', label="Contains (median)")
 
-# Group by filter size and method, calculate average per-call time
-avg_times = data.groupby(["filter_size", "method_name"])["per_call_time"].mean().unstack()
+    plt.xlabel("Bloom Filter Size")
+    plt.ylabel("Time per Call (seconds)")
+    plt.title("Median Time per Call for add() and contains() by Bloom Filter Size")
+    plt.legend()
+    plt.grid(True, linestyle="--", alpha=0.5)
+    plt.tight_layout()
 
-# Plotting
-plt.figure(figsize=(10, 6))
-plt.plot(avg_times.index, avg_times["add"], marker='o', label="Add (average)")
-plt.plot(avg_times.index, avg_times["contains"], marker='o', label="Contains (average)")
+    plt.savefig(os.path.join(OUTPUT_DIR, "profile_average_bf_plot.png"), dpi=300)
+    print("Saved plot to profile_average_bf_plot.png")
 
-plt.xlabel("Bloom Filter Size")
-plt.ylabel("Average Time per Call (seconds)")
-plt.title("Average Time per Call for add() and contains() by Bloom Filter Size")
-plt.legend()
-plt.grid(True, linestyle="--", alpha=0.5)
-plt.tight_layout()
 
-# Save the plot
-plt.savefig("statistics/profile_average_bf_plot.png", dpi=300)
-print("Saved plot to bloom_filter_avg_times.png")
+if __name__ == "__main__":
+    perfilado_bloom_filter()
+    graficar()
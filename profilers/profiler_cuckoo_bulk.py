@@ -0,0 +1,84 @@
+"""Bulk construction and batch lookup of CuckooHashTable against the sequential path.
+
+For every key count, the same random 64-bit keys are loaded into a table of
+load factor 0.4 with one insert() per key and with from_keys(), and looked up
+with one contains() per key and with contains_many() (half of the queries
+are hits). Times are wall-clock for the whole batch.
+
+The results are saved in statistics/
+"""
+import os
+import csv
+import time
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from structures.cuckoo_hashing import CuckooHashTable
+
+OUTPUT_DIR = "statistics"
+os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+BULK_CSV = os.path.join(OUTPUT_DIR, "cuckoo_bulk_profile.csv")
+
+KEY_COUNTS = [10**5, 10**6, 10**7]
+LOAD = 0.4
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+def build_sequential(keys):
+    table = CuckooHashTable(size=int(len(keys) / (2 * LOAD)) + 1, max_displacements=50)
+    for key in keys:
+        table.insert(key)
+    return table
+
+def contains_sequential(table, queries):
+    return [table.contains(key) for key in queries]
+
+def perfilado_cuckoo_bulk():
+    rng = np.random.default_rng(1)
+    with open(BULK_CSV, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["num_keys", "path", "build_time_s", "lookup_time_s"])
+        for n in KEY_COUNTS:
+            keys = rng.integers(np.iinfo(np.int64).min, np.iinfo(np.int64).max, size=n, dtype=np.int64)
+            misses = rng.integers(np.iinfo(np.int64).min, np.iinfo(np.int64).max, size=n // 2, dtype=np.int64)
+            queries = np.concatenate([keys[:n - n // 2], misses])
+            key_list, query_list = keys.tolist(), queries.tolist()
+
+            table, build_time = timed(build_sequential, key_list)
+            _, lookup_time = timed(contains_sequential, table, query_list)
+            writer.writerow([n, "sequential", build_time, lookup_time])
+            del table
+
+            table, bulk_build_time = timed(CuckooHashTable.from_keys, keys, LOAD)
+            _, bulk_lookup_time = timed(table.contains_many, queries)
+            writer.writerow([n, "bulk", bulk_build_time, bulk_lookup_time])
+            del table
+            print(f"{n:>10,} keys: build {build_time / bulk_build_time:.1f}x, "
+                  f"lookup {lookup_time / bulk_lookup_time:.1f}x faster in bulk")
+
+def graficar():
+    df = pd.read_csv(BULK_CSV)
+    for column, ylabel, name in [("build_time_s", "Build Time (s)", "cuckoo_bulk_build.png"),
+                                 ("lookup_time_s", "Lookup Time (s)", "cuckoo_bulk_lookup.png")]:
+        plt.figure()
+        for path, group in df.groupby("path"):
+            plt.plot(group["num_keys"], group[column], marker="o", label=path)
+        plt.xscale("log")
+        plt.yscale("log")
+        plt.xlabel("Number of Keys")
+        plt.ylabel(ylabel)
+        plt.title("Cuckoo Hashing: Bulk vs Sequential")
+        plt.legend()
+        plt.grid(True, which="both")
+        plt.tight_layout()
+        plt.savefig(os.path.join(OUTPUT_DIR, name), dpi=300)
+        plt.close()
+
+
+if __name__ == "__main__":
+    perfilado_cuckoo_bulk()
+    graficar()
@@ -2,9 +2,11 @@ import os
 import time
 import random
 import csv
+import statistics
 import pandas as pd
 import matplotlib.pyplot as plt
 from structures.cuckoo_hashing import CuckooHashTable
+from profilers.benchmark import time_case
 
 OUTPUT_DIR = "statistics"
 os.makedirs(OUTPUT_DIR, exist_ok=True)
@@ -15,6 +17,8 @@ SEARCH_CSV = os.path.join(OUTPUT_DIR, "cuckoo_search_profile.csv")
 
 TABLE_SIZES = list(range(100, 10001, 250))
 MAX_FAIL_RATIO = 0.1
+INSERT_BATCH = 50
+SEARCH_TRIALS = 7
 
 def generate_keys(n, key_space=10**6):
     return random.sample(range(key_space), n)
@@ -36,39 +40,36 @@ def perfilado_cuckoo():
             cuckoo = CuckooHashTable(size=table_size, max_displacements=20)
             keys = generate_keys(int(2.5 * table_size))
 
-            insert_times, inserted_keys = [], []
+            # Insertions are timed in batches so timer overhead is amortised
+            insert_time, inserted_keys = 0.0, []
             success_count, fail_count = 0, 0
 
-            for key in keys:
+            for start_idx in range(0, len(keys), INSERT_BATCH):
+                batch = keys[start_idx:start_idx + INSERT_BATCH]
                 start = time.perf_counter()
-                success = cuckoo.insert(key)
-                elapsed = time.perf_counter() - start
+                results = [cuckoo.insert(key) for key in batch]
+                insert_time += time.perf_counter() - start
 
-                if success:
-                    insert_times.append(elapsed)
-                    inserted_keys.append(key)
-                    success_count += 1
-                else:
-                    fail_count += 1
+                for key, success in zip(batch, results):
+                    if success:
+                        inserted_keys.append(key)
+                        success_count += 1
+                    else:
+                        fail_count += 1
 
                 total = success_count + fail_count
                 if total > 20 and (fail_count / total) > MAX_FAIL_RATIO:
                     break
 
             load_factor = success_count / (2 * table_size)
-            avg_insert_time = sum(insert_times) / len(insert_times)
+            # Failed inserts are timed too, but the average is per inserted key
+            avg_insert_time = insert_time / max(success_count, 1)
 
             insert_writer.writerow([table_size, success_count, avg_insert_time])
             failure_writer.writerow([table_size, total, round(load_factor, 2), round(fail_count / total, 4)])
 
-            search_times = []
-            for key in inserted_keys:
-                start = time.perf_counter()
-                cuckoo.contains(key)
-                elapsed = time.perf_counter() - start
-                search_times.append(elapsed)
-
-            avg_search_time = sum(search_times) / len(search_times)
+            search_times = time_case(lambda: (cuckoo.contains, inserted_keys), SEARCH_TRIALS)
+            avg_search_time = statistics.median(search_times)
             search_writer.writerow([table_size, len(inserted_keys), avg_search_time])
 
     print("Perfilado completo: inserción, fallos y búsqueda.")
@@ -0,0 +1,136 @@
+"""Hasher family x structure benchmark.
+
+Every hasher family is plugged into BloomFilter and CuckooHashTable and
+measured on the same random 64-bit keys:
+- throughput in keys/s of scalar inserts and lookups (timed in batches with
+  time_case()) and of the batch paths (add_many/contains_many);
+- quality: for Bloom filters, the empirical false positive rate at capacity
+  over several seeds against the theoretical rate; for cuckoo tables, the load
+  factor reached at the first failed insert (max_displacements=50);
+- memory allocated per key, hash tables included.
+
+The fastest family meeting the quality bar (--fpr-slack times the
+theoretical rate, --min-load) is reported for each structure.
+
+Usage:
+    python -m profilers.profiler_hash_families [--fpr-slack 1.2] [--min-load 0.45]
+
+The results are saved in statistics/
+"""
+import argparse
+import csv
+import os
+import statistics
+import time
+from functools import partial
+import numpy as np
+from profilers.benchmark import time_case, memory_per_key
+from structures.cuckoo_hashing import CuckooHashTable
+from structures.false_positive import aggregate, bloom_factory, random_keys, run_trial
+from structures.tabulated_bloom_filter import BloomFilter
+from tabulation_hashes.families import FAMILIES
+
+OUTPUT_DIR = "statistics"
+os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+FAMILIES_CSV = os.path.join(OUTPUT_DIR, "hash_families_profile.csv")
+
+NUM_KEYS = 20000
+TOLERANCE = 0.01
+SEEDS = range(5)
+NUM_QUERIES = 50000
+TRIALS = 5
+
+FIELDS = ["family", "structure", "insert_keys_per_s", "lookup_keys_per_s", "batch_insert_keys_per_s",
+          "batch_lookup_keys_per_s", "quality_metric", "quality", "theoretical", "bytes_per_key"]
+
+def keys_per_s(samples):
+    return 1 / statistics.median(samples)
+
+def timed_batch(fn, keys):
+    start = time.perf_counter()
+    fn(keys)
+    return len(keys) / (time.perf_counter() - start)
+
+def bloom_row(family, keys, key_list):
+    new = lambda: BloomFilter(max_size=len(keys), max_tolerance=TOLERANCE, seed=1, family=family)
+    bf = new().add_many(keys)
+    trials = [run_trial(bloom_factory, len(keys), TOLERANCE, seed, num_queries=NUM_QUERIES,
+                        fill_steps=1, family=family) for seed in SEEDS]
+    at_capacity = aggregate(trials)[-1]
+    return {
+        "insert_keys_per_s": keys_per_s(time_case(lambda: (new().add, key_list), TRIALS)),
+        "lookup_keys_per_s": keys_per_s(time_case(lambda: (bf.contains, key_list), TRIALS)),
+        "batch_insert_keys_per_s": timed_batch(new().add_many, keys),
+        "batch_lookup_keys_per_s": timed_batch(bf.contains_many, keys),
+        "quality_metric": "fpr",
+        "quality": at_capacity["empirical_fpr"],
+        "theoretical": at_capacity["theoretical_fpr"],
+        "bytes_per_key": memory_per_key(lambda k: new().add_many(keys), key_list),
+    }
+
+def max_load(family, seed):
+    """Load factor at the first failed insert of random keys."""
+    size = NUM_KEYS // 2
+    table = CuckooHashTable(size=size, max_displacements=50, seed=seed, family=family)
+    rng = np.random.default_rng(seed)
+    inserted = 0
+    for key in random_keys(rng, 2 * size).tolist():
+        if not table.insert(key):
+            break
+        inserted += 1
+    return inserted / (2 * size)
+
+def cuckoo_row(family, keys, key_list):
+    size = int(len(keys) / 0.8) + 1
+    new = lambda: CuckooHashTable(size=size, max_displacements=50, seed=1, family=family)
+    table = CuckooHashTable.from_keys(keys, family=family)
+    return {
+        "insert_keys_per_s": keys_per_s(time_case(lambda: (new().insert, key_list), TRIALS)),
+        "lookup_keys_per_s": keys_per_s(time_case(lambda: (table.contains, key_list), TRIALS)),
+        "batch_insert_keys_per_s": timed_batch(partial(CuckooHashTable.from_keys, family=family), keys),
+        "batch_lookup_keys_per_s": timed_batch(table.contains_many, keys),
+        "quality_metric": "max_load",
+        "quality": float(np.mean([max_load(family, seed) for seed in SEEDS])),
+        "theoretical": 0.5,
+        "bytes_per_key": memory_per_key(lambda k: CuckooHashTable.from_keys(k, family=family), key_list),
+    }
+
+def meets_bar(row, fpr_slack, min_load):
+    if row["quality_metric"] == "fpr":
+        return row["quality"] <= fpr_slack * row["theoretical"]
+    return row["quality"] >= min_load
+
+def perfilado_familias(fpr_slack=1.2, min_load=0.45):
+    keys = random_keys(np.random.default_rng(1), NUM_KEYS)
+    key_list = keys.tolist()
+    rows = []
+    for structure, measure in (("bloom", bloom_row), ("cuckoo", cuckoo_row)):
+        for family in FAMILIES:
+            row = {"family": family, "structure": structure}
+            row.update(measure(family, keys, key_list))
+            rows.append(row)
+            print(f"{structure:>7} {family:>8}: {row['lookup_keys_per_s']:>10,.0f} lookups/s  "
+                  f"{row['batch_lookup_keys_per_s']:>12,.0f} batch/s  "
+                  f"{row['quality_metric']} {row['quality']:.4f}  {row['bytes_per_key']:.1f} B/key")
+
+    with open(FAMILIES_CSV, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+
+    for structure in ("bloom", "cuckoo"):
+        passing = [row for row in rows if row["structure"] == structure and meets_bar(row, fpr_slack, min_load)]
+        if passing:
+            best = max(passing, key=lambda row: row["lookup_keys_per_s"])
+            print(f"Fastest {structure} family meeting the bar: {best['family']}")
+        else:
+            print(f"No family meets the bar for {structure}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--fpr-slack", type=float, default=1.2, help="max empirical / theoretical FPR")
+    parser.add_argument("--min-load", type=float, default=0.45, help="min cuckoo load factor at first failure")
+    args = parser.parse_args()
+    perfilado_familias(args.fpr_slack, args.min_load)
@@ -0,0 +1,80 @@
+"""Throughput comparison of the tabulation hash families.
+
+Every family is timed on the same random 32-bit integer keys through its
+scalar hash(). Mixed tabulation is additionally timed through its compiled
+scalar path and its NumPy batch path.
+
+The results are saved in statistics/
+"""
+import os
+import csv
+import time
+import random
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from tabulation_hashes import TabulationHash, TwistedTabulationHash, DoubleTabulationHash, MixedTabulationHash
+
+OUTPUT_DIR = "statistics"
+os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+THROUGHPUT_CSV = os.path.join(OUTPUT_DIR, "hash_throughput.csv")
+
+NUM_KEYS = 200000
+REPEATS = 5
+
+def best_time(fn, keys):
+    """Best of REPEATS wall-clock times of fn over all keys, in seconds."""
+    best = float("inf")
+    for _ in range(REPEATS):
+        start = time.perf_counter()
+        fn(keys)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def scalar_runner(hash_fn):
+    def run(keys):
+        for k in keys:
+            hash_fn(k)
+    return run
+
+def perfilado_hashes():
+    keys = [random.getrandbits(32) for _ in range(NUM_KEYS)]
+    key_array = np.array(keys, dtype=np.uint64)
+    mixed = MixedTabulationHash(seed=4)
+
+    cases = [
+        ("simple", "scalar", scalar_runner(TabulationHash(seed=1).hash), keys),
+        ("twisted", "scalar", scalar_runner(TwistedTabulationHash(seed=2).hash), keys),
+        ("double", "scalar", scalar_runner(DoubleTabulationHash(seed=3).hash), keys),
+        ("mixed", "scalar", scalar_runner(mixed.hash), keys),
+        ("mixed", "compiled", scalar_runner(mixed.compile()), keys),
+        ("mixed", "batch", mixed.hash_many, key_array),
+    ]
+
+    with open(THROUGHPUT_CSV, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["family", "path", "num_keys", "best_time_s", "keys_per_s"])
+        for family, path, run, data in cases:
+            elapsed = best_time(run, data)
+            writer.writerow([family, path, NUM_KEYS, elapsed, NUM_KEYS / elapsed])
+            print(f"{family:>8} {path:>9}: {NUM_KEYS / elapsed:,.0f} keys/s")
+
+def graficar():
+    df = pd.read_csv(THROUGHPUT_CSV)
+    labels = [f"{family}\n{path}" for family, path in zip(df["family"], df["path"])]
+
+    plt.figure(figsize=(10, 6))
+    plt.bar(labels, df["keys_per_s"], color="teal")
+    plt.yscale("log")
+    plt.ylabel("Keys per second (log)")
+    plt.title("Tabulation Hash Throughput")
+    plt.grid(axis="y", linestyle="--", alpha=0.5)
+    plt.tight_layout()
+    plt.savefig(os.path.join(OUTPUT_DIR, "hash_throughput.png"), dpi=300)
+    plt.close()
+
+
+if __name__ == "__main__":
+    perfilado_hashes()
+    graficar()
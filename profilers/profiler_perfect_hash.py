@@ -0,0 +1,79 @@
+"""Build time, lookup latency and size of the perfect hash index.
+
+For every key count, a PerfectHashIndex and a CuckooHashTable (load factor
+0.4) are built from the same random 64-bit keys. Build time is wall-clock;
+scalar lookups are timed in batches with time_case() (index() against
+contains()), batch lookups through index_many(). Size is the index itself in
+bits per key against the memory the cuckoo table allocates per key.
+
+The results are saved in statistics/
+"""
+import os
+import csv
+import time
+import statistics
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from structures.perfect_hash import PerfectHashIndex
+from profilers.benchmark import time_case, memory_per_key, build_cuckoo
+
+OUTPUT_DIR = "statistics"
+os.makedirs(OUTPUT_DIR, exist_ok=True)
+
+PERFECT_HASH_CSV = os.path.join(OUTPUT_DIR, "perfect_hash_profile.csv")
+
+KEY_COUNTS = [1000, 10000, 100000, 300000]
+LOOKUPS = 20000
+TRIALS = 7
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+def perfilado_perfect_hash():
+    rng = np.random.default_rng(1)
+    with open(PERFECT_HASH_CSV, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["structure", "num_keys", "build_time_s", "lookup_time_s",
+                         "batch_lookup_time_s", "bits_per_key"])
+        for n in KEY_COUNTS:
+            keys = np.unique(rng.integers(np.iinfo(np.int64).min, np.iinfo(np.int64).max, size=n, dtype=np.int64))
+            key_list = keys.tolist()
+            lookups = key_list[:LOOKUPS]
+
+            index, build_time = timed(PerfectHashIndex.build, keys)
+            lookup_time = statistics.median(time_case(lambda: (index.index, lookups), TRIALS))
+            _, batch_time = timed(index.index_many, keys)
+            writer.writerow(["perfect_hash", n, build_time, lookup_time, batch_time / n, index.bits_per_key()])
+
+            table, build_time = timed(build_cuckoo, key_list)
+            lookup_time = statistics.median(time_case(lambda: (table.contains, lookups), TRIALS))
+            bits = 8 * memory_per_key(build_cuckoo, key_list)
+            writer.writerow(["cuckoo", n, build_time, lookup_time, "", bits])
+            print(f"{n:>8} keys: perfect hash {index.bits_per_key():.2f} bits/key, cuckoo {bits:.0f} bits/key")
+
+def graficar():
+    df = pd.read_csv(PERFECT_HASH_CSV)
+    for column, ylabel, name in [("build_time_s", "Build Time (s)", "perfect_hash_build.png"),
+                                 ("lookup_time_s", "Lookup Time (s)", "perfect_hash_lookup.png"),
+                                 ("bits_per_key", "Bits per Key", "perfect_hash_size.png")]:
+        plt.figure()
+        for structure, group in df.groupby("structure"):
+            plt.plot(group["num_keys"], group[column], marker="o", label=structure)
+        plt.xscale("log")
+        plt.yscale("log")
+        plt.xlabel("Number of Keys")
+        plt.ylabel(ylabel)
+        plt.title("Perfect Hash vs Cuckoo Hashing")
+        plt.legend()
+        plt.grid(True, which="both")
+        plt.tight_layout()
+        plt.savefig(os.path.join(OUTPUT_DIR, name), dpi=300)
+        plt.close()
+
+
+if __name__ == "__main__":
+    perfilado_perfect_hash()
+    graficar()
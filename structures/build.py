@@ -0,0 +1,291 @@
+"""Streaming construction of Bloom filters and cuckoo tables from key files.
+
+Keys are read either newline-delimited ("lines", with \n or \r\n line
+endings; empty lines are skipped) or
+length-delimited ("length", each key preceded by its length as a 4-byte
+big-endian integer). Files are memory-mapped and scanned in windows of
+chunk_bytes; delimiters are found with NumPy over the mapping itself, so no
+per-key strings are created to hash them. stdin is read in blocks of the same
+size. Each window becomes a KeyChunk whose keys are hashed in bulk.
+
+Memory for the input stays bounded by the window size whatever the input
+size. A cuckoo table stores its keys, so those are materialised as bytes and
+placed all at once with CuckooHashTable.from_keys().
+
+Usage:
+    python -m structures.build bloom keys.txt -o keys.bf --capacity 1000000
+    cat keys.txt | python -m structures.build cuckoo - -o keys.cuckoo --load 0.4
+"""
+import argparse
+import mmap
+import os
+import struct
+import sys
+import time
+from typing import BinaryIO, Callable, Iterator, List, Optional, Tuple, Union
+import numpy as np
+from structures.cuckoo_hashing import CuckooHashTable
+from structures.tabulated_bloom_filter import BloomFilter
+from tabulation_hashes.codecs import bytes_to_array
+from tabulation_hashes.families import FAMILIES
+
+CHUNK_BYTES = 8 << 20
+FORMATS = ("lines", "length")
+_LENGTH_PREFIX = struct.Struct(">I")
+
+
+class KeyChunk:
+    """
+    A window of the input and the [start, end) offsets of the keys in it.
+    The window is a view of the mapped file (or of the stdin block), so the
+    keys are not copied until keys() is called.
+    """
+    def __init__(self, buffer: np.ndarray, starts: np.ndarray, ends: np.ndarray):
+        self.buffer = buffer
+        self.starts = starts
+        self.ends = ends
+
+    def __len__(self) -> int:
+        return len(self.starts)
+
+    @property
+    def nbytes(self) -> int:
+        return int((self.ends - self.starts).sum())
+
+    def int_keys(self) -> np.ndarray:
+        """
+        uint64 array with each key read as a big-endian integer and reduced
+        to its low 64 bits (its last 8 bytes), which is what the hashes read
+        from a bytes key, computed without building the keys.
+        """
+        return bytes_to_array(self.buffer, self.starts, self.ends)
+
+    def keys(self) -> List[bytes]:
+        view = memoryview(self.buffer)
+        return [bytes(view[s:e]) for s, e in zip(self.starts.tolist(), self.ends.tolist())]
+
+
+def _split_lines(data: np.ndarray, final: bool) -> Tuple[KeyChunk, int]:
+    newlines = np.flatnonzero(data == 10)
+    starts = np.concatenate(([0], newlines + 1))
+    ends = np.concatenate((newlines, [len(data)]))
+    if final:
+        consumed = len(data)
+    else:
+        # The part after the last newline may continue in the next window
+        starts, ends = starts[:-1], ends[:-1]
+        consumed = int(newlines[-1]) + 1 if len(newlines) else 0
+    # Drop the \r of \r\n line endings
+    crlf = ends > starts
+    crlf[crlf] = data[ends[crlf] - 1] == 13
+    ends = ends - crlf
+    keep = ends > starts
+    return KeyChunk(data, starts[keep], ends[keep]), consumed
+
+
+def _split_length_prefixed(data: np.ndarray, final: bool) -> Tuple[KeyChunk, int]:
+    view = memoryview(data)
+    starts, ends = [], []
+    pos, size = 0, len(data)
+    while pos + _LENGTH_PREFIX.size <= size:
+        (length,) = _LENGTH_PREFIX.unpack_from(view, pos)
+        end = pos + _LENGTH_PREFIX.size + length
+        if end > size:
+            break
+        starts.append(pos + _LENGTH_PREFIX.size)
+        ends.append(end)
+        pos = end
+    if final and pos != size:
+        raise ValueError("input ends in the middle of a length-delimited key")
+    return KeyChunk(data, np.array(starts, dtype=np.int64), np.array(ends, dtype=np.int64)), pos
+
+
+_SPLITTERS = {"lines": _split_lines, "length": _split_length_prefixed}
+
+
+def _iter_windows(data: np.ndarray, split: Callable, chunk_bytes: int) -> Iterator[KeyChunk]:
+    pos, size = 0, len(data)
+    window = chunk_bytes
+    while pos < size:
+        end = min(pos + window, size)
+        chunk, consumed = split(data[pos:end], end == size)
+        if consumed == 0:
+            # A single key is longer than the window
+            window *= 2
+            continue
+        window = chunk_bytes
+        pos += consumed
+        if len(chunk):
+            yield chunk
+
+
+def _iter_stream(stream: BinaryIO, split: Callable, chunk_bytes: int) -> Iterator[KeyChunk]:
+    carry = b""
+    while True:
+        block = stream.read(chunk_bytes)
+        final = not block
+        data = np.frombuffer(carry + block, dtype=np.uint8)
+        if len(data) == 0:
+            return
+        chunk, consumed = split(data, final)
+        if len(chunk):
+            yield chunk
+        carry = data[consumed:].tobytes()
+        if final:
+            return
+
+
+def iter_key_chunks(source: Union[str, os.PathLike, BinaryIO], fmt: str = "lines",
+                    chunk_bytes: int = CHUNK_BYTES) -> Iterator[KeyChunk]:
+    """
+    Yields the keys of source chunk by chunk.
+    - source: Path of a file (memory-mapped), "-" for stdin, or a binary stream.
+    - fmt: "lines" or "length".
+    - chunk_bytes: Size of the window scanned at a time.
+    """
+    if fmt not in FORMATS:
+        raise ValueError(f"fmt must be one of {FORMATS}, got {fmt!r}")
+    if not isinstance(chunk_bytes, int) or chunk_bytes <= 0:
+        raise TypeError("chunk_bytes must be a positive integer")
+    split = _SPLITTERS[fmt]
+
+    if source == "-":
+        yield from _iter_stream(sys.stdin.buffer, split, chunk_bytes)
+        return
+    if hasattr(source, "read"):
+        yield from _iter_stream(source, split, chunk_bytes)
+        return
+
+    with open(source, "rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    # The mapping is not closed explicitly: chunks handed out are views of it,
+    # and it is unmapped once the last of them is released
+    yield from _iter_windows(np.frombuffer(mm, dtype=np.uint8), split, chunk_bytes)
+
+
+def count_keys(source, fmt: str = "lines", chunk_bytes: int = CHUNK_BYTES) -> int:
+    return sum(len(chunk) for chunk in iter_key_chunks(source, fmt, chunk_bytes))
+
+
+class Progress:
+    """Reports keys, bytes and throughput to a stream at most every interval seconds."""
+    def __init__(self, stream=sys.stderr, interval: float = 1.0):
+        self.stream = stream
+        self.interval = interval
+        self.keys = 0
+        self.bytes = 0
+        self.start = time.perf_counter()
+        self._last = 0.0
+
+    def update(self, chunk: KeyChunk) -> None:
+        self.keys += len(chunk)
+        self.bytes += chunk.nbytes
+        now = time.perf_counter()
+        if now - self._last >= self.interval:
+            self._last = now
+            self._report(now, end="\r")
+
+    def done(self) -> None:
+        self._report(time.perf_counter(), end="\n")
+
+    def _report(self, now: float, end: str) -> None:
+        elapsed = max(now - self.start, 1e-9)
+        print(f"{self.keys:,} keys, {self.bytes / 2**20:,.1f} MiB, "
+              f"{self.keys / elapsed:,.0f} keys/s", end=end, file=self.stream, flush=True)
+
+
+def build_bloom(chunks, capacity: int, tolerance: float = 0.01, seed: int = None,
+                progress: Optional[Progress] = None, family: str = "simple") -> BloomFilter:
+    bf = BloomFilter(max_size=capacity, max_tolerance=tolerance, seed=seed, family=family)
+    for chunk in chunks:
+        bf.add_many(chunk.int_keys())
+        if progress:
+            progress.update(chunk)
+    return bf
+
+
+def build_cuckoo(chunks, load: float = 0.4, max_displacements: int = 50,
+                 progress: Optional[Progress] = None, seed: int = None,
+                 family: str = "twisted", size: Optional[int] = None) -> CuckooHashTable:
+    """
+    Collects the keys and places them with CuckooHashTable.from_keys(), which
+    needs no evictions. Duplicate keys are stored once.
+    - load: Target load factor over both tables.
+    - size: Slots per table; overrides load (from_keys() still grows it if
+      the keys cannot be placed).
+    Raises ValueError if the keys cannot be placed or do not fit in size.
+    """
+    keys = []
+    for chunk in chunks:
+        keys.extend(chunk.keys())
+        if progress:
+            progress.update(chunk)
+    if size is not None:
+        if not isinstance(size, int) or size <= 0:
+            raise TypeError("size must be a positive integer")
+        keys = list(dict.fromkeys(keys))
+        if len(keys) > size:
+            raise ValueError(f"{len(keys):,} keys do not fit in 2 x {size:,} slots at load 0.5")
+        load = len(keys) / (2 * size) or 0.5
+    return CuckooHashTable.from_keys(keys, load=load, max_displacements=max_displacements,
+                                     seed=seed, family=family)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m structures.build", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="structure", required=True)
+
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("input", help="key file, or - for stdin")
+    common.add_argument("-o", "--output", required=True)
+    common.add_argument("--format", choices=FORMATS, default="lines")
+    common.add_argument("--chunk-bytes", type=int, default=CHUNK_BYTES)
+    common.add_argument("--quiet", action="store_true", help="do not report progress")
+    common.add_argument("--family", choices=tuple(FAMILIES), help="hasher family (default: the structure's)")
+
+    bloom = sub.add_parser("bloom", parents=[common], help="build a BloomFilter")
+    bloom.add_argument("--capacity", type=int, help="expected keys (default: count them; files only)")
+    bloom.add_argument("--tolerance", type=float, default=0.01)
+    bloom.add_argument("--seed", type=int)
+
+    cuckoo = sub.add_parser("cuckoo", parents=[common], help="build a CuckooHashTable")
+    cuckoo.add_argument("--size", type=int, help="slots per table (default: from --load)")
+    cuckoo.add_argument("--load", type=float, default=0.4, help="target load factor (ignored with --size)")
+    cuckoo.add_argument("--max-displacements", type=int, default=50)
+    cuckoo.add_argument("--seed", type=int)
+
+    args = parser.parse_args(argv)
+
+    if args.structure == "bloom" and args.capacity is None:
+        if args.input == "-":
+            parser.error("--capacity is required when reading from stdin")
+        num_keys = max(1, count_keys(args.input, args.format, args.chunk_bytes))
+
+    progress = None if args.quiet else Progress()
+    chunks = iter_key_chunks(args.input, args.format, args.chunk_bytes)
+
+    if args.structure == "bloom":
+        capacity = args.capacity if args.capacity is not None else num_keys
+        bf = build_bloom(chunks, capacity, args.tolerance, args.seed, progress, args.family or "simple")
+        bf.save(args.output)
+        summary = f"BloomFilter with {bf.num_bits:,} bits, fill ratio {bf.fill_ratio():.3f}"
+    else:
+        try:
+            table = build_cuckoo(chunks, args.load, args.max_displacements, progress, args.seed,
+                                 args.family or "twisted", args.size)
+        except ValueError as exc:
+            parser.error(str(exc))
+        table.save(args.output)
+        summary = f"CuckooHashTable with 2 x {table.size:,} slots, load factor {table.load_factor():.3f}"
+
+    if progress:
+        progress.done()
+    print(f"Saved {summary} to {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
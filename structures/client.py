@@ -0,0 +1,157 @@
+"""Asyncio client of the membership server (structures.server).
+
+A MembershipClient keeps a pool of connections and spreads requests over
+them round-robin. Requests are pipelined: each one is written as soon as it
+is made and matched to its response by request id, so many concurrent calls
+(or one contains_many()) share a few connections and reach the server in the
+same batch.
+
+    async with MembershipClient(path="/tmp/membership.sock") as client:
+        await client.contains("users", "alice")
+        await client.contains_many("users", ["alice", "bob"])
+"""
+import asyncio
+from itertools import cycle
+from typing import Dict, Iterable, List, Optional
+from structures.protocol import (RESPONSE, OP_LOOKUP, OP_CONTAINS, OP_ADD, STATUS_OK, ERRORS,
+                                 encode_request)
+
+POOL_SIZE = 4
+
+
+class _Connection:
+    """One socket with its in-flight requests."""
+    def __init__(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        self._reader = reader
+        self._writer = writer
+        self._pending: Dict[int, asyncio.Future] = {}
+        self._next_id = 0
+        self._closed = False
+        self._task = asyncio.get_running_loop().create_task(self._read_responses())
+
+    def request(self, op: int, structure: int, key) -> asyncio.Future:
+        if self._closed:
+            raise ConnectionError("connection to the membership server is closed")
+        request_id = self._next_id
+        self._next_id = (request_id + 1) & 0xFFFFFFFF
+        frame = encode_request(request_id, op, structure, key)
+        future = asyncio.get_running_loop().create_future()
+        self._pending[request_id] = future
+        self._writer.write(frame)
+        return future
+
+    async def drain(self) -> None:
+        await self._writer.drain()
+
+    async def _read_responses(self) -> None:
+        try:
+            while True:
+                request_id, status, value = RESPONSE.unpack(await self._reader.readexactly(RESPONSE.size))
+                future = self._pending.pop(request_id, None)
+                if future is None or future.done():
+                    continue
+                if status == STATUS_OK:
+                    future.set_result(value)
+                else:
+                    future.set_exception(ValueError(ERRORS.get(status, f"error status {status}")))
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._closed = True
+            for future in self._pending.values():
+                if not future.done():
+                    future.set_exception(ConnectionError("connection to the membership server was closed"))
+            self._pending.clear()
+
+    async def close(self) -> None:
+        self._writer.close()
+        try:
+            await self._writer.wait_closed()
+        except ConnectionError:
+            pass
+        await self._task
+
+
+class MembershipClient:
+    """
+    Client of a MembershipServer.
+    - path: Unix socket path; if None, connects to host:port over TCP.
+    - pool_size: Connections to open.
+    Raises ValueError for server errors (unknown structure, add to a
+    read-only structure, failed operation).
+    """
+    def __init__(self, path: Optional[str] = None, host: str = "127.0.0.1", port: Optional[int] = None,
+                 pool_size: int = POOL_SIZE):
+        if path is None and port is None:
+            raise TypeError("either path or port is required")
+        if not isinstance(pool_size, int) or pool_size <= 0:
+            raise TypeError("pool_size must be a positive integer")
+        self.path = path
+        self.host = host
+        self.port = port
+        self.pool_size = pool_size
+        self._connections: List[_Connection] = []
+        self._round_robin = None
+        self._ids: Dict[str, int] = {}
+
+    async def connect(self) -> "MembershipClient":
+        for _ in range(self.pool_size - len(self._connections)):
+            if self.path is not None:
+                reader, writer = await asyncio.open_unix_connection(self.path)
+            else:
+                reader, writer = await asyncio.open_connection(self.host, self.port)
+            self._connections.append(_Connection(reader, writer))
+        self._round_robin = cycle(self._connections)
+        return self
+
+    async def close(self) -> None:
+        connections, self._connections = self._connections, []
+        for connection in connections:
+            await connection.close()
+
+    async def __aenter__(self) -> "MembershipClient":
+        return await self.connect()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.close()
+
+    def _connection(self) -> _Connection:
+        if not self._connections:
+            raise ConnectionError("client is not connected; call connect() first")
+        return next(self._round_robin)
+
+    async def structure_id(self, name: str) -> int:
+        if name not in self._ids:
+            connection = self._connection()
+            future = connection.request(OP_LOOKUP, 0, name)
+            await connection.drain()
+            self._ids[name] = await future
+        return self._ids[name]
+
+    async def _call(self, op: int, structure: str, key) -> bool:
+        sid = await self.structure_id(structure)
+        connection = self._connection()
+        future = connection.request(op, sid, key)
+        await connection.drain()
+        return bool(await future)
+
+    async def _call_many(self, op: int, structure: str, keys: Iterable) -> List[bool]:
+        sid = await self.structure_id(structure)
+        futures = [self._connection().request(op, sid, key) for key in keys]
+        for connection in self._connections:
+            await connection.drain()
+        return [bool(value) for value in await asyncio.gather(*futures)]
+
+    async def contains(self, structure: str, key) -> bool:
+        return await self._call(OP_CONTAINS, structure, key)
+
+    async def add(self, structure: str, key) -> bool:
+        """Adds key; False if a cuckoo table could not insert it."""
+        return await self._call(OP_ADD, structure, key)
+
+    async def contains_many(self, structure: str, keys: Iterable) -> List[bool]:
+        """Pipelines one request per key over the pool."""
+        return await self._call_many(OP_CONTAINS, structure, keys)
+
+    async def add_many(self, structure: str, keys: Iterable) -> List[bool]:
+        return await self._call_many(OP_ADD, structure, keys)
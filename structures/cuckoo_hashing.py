@@ -1,9 +1,146 @@
-import random
-from typing import Union, List, Optional
-from tabulation_hashes.twisted_tabulation_hash import TwistedTabulationHash
+import math
+import mmap as _mmap
+import secrets
+import struct
+import time
+from typing import Iterable, Union, List, Optional, Tuple
+import numpy as np
+from structures.instrumentation import OperationStats
+from tabulation_hashes.codecs import MASK64, key_to_int, keys_to_array
+from tabulation_hashes.families import Family, family_name, make_hashers
+
+# File layout (little-endian): header, then either
+# - int layout: int64 keys of table1 and table2 (size each), then one
+#   occupancy byte per slot of table1 and table2;
+# - arena layout: 2 * size + 1 uint64 offsets into the key arena (slot i of
+#   table1 is i, slot i of table2 is size + i; an empty slot has no bytes),
+#   then the arena, where every key is a type tag followed by its bytes.
+_FILE_MAGIC = b"TCK1"
+# magic, layout, size, max_displacements, seed1, seed2, family name (empty if custom)
+_FILE_HEADER = struct.Struct("<4sB3xQQqq8s")
+_INT_LAYOUT, _ARENA_LAYOUT = 0, 1
+_INT64_MIN, _INT64_MAX = -(1 << 63), (1 << 63) - 1
+
+
+def _encode_arena_key(key) -> bytes:
+    if isinstance(key, bytes):
+        return b"b" + key
+    if isinstance(key, str):
+        return b"s" + key.encode()
+    if isinstance(key, int) and not isinstance(key, bool):
+        return b"i" + key.to_bytes((key.bit_length() + 8) // 8, byteorder="little", signed=True)
+    raise TypeError(f"cannot save key of type {type(key).__name__}; only int, str and bytes keys are supported")
+
+
+def _decode_arena_key(data: memoryview):
+    tag, payload = data[0], data[1:]
+    if tag == ord("b"):
+        return bytes(payload)
+    if tag == ord("s"):
+        return str(payload, "utf-8")
+    return int.from_bytes(payload, byteorder="little", signed=True)
+
+
+def _orient(u: np.ndarray, w: np.ndarray, num_vertices: int) -> Optional[np.ndarray]:
+    """
+    Places every key of the cuckoo graph, where key i is an edge between its
+    slots u[i] and w[i], in a slot of its own. Returns the slot of each key,
+    or None if some connected component has more keys than slots.
+    """
+    slot = np.full(len(u), -1, dtype=np.int64)
+    degree = np.bincount(u, minlength=num_vertices) + np.bincount(w, minlength=num_vertices)
+    alive = np.arange(len(u))
+    # Peel in vectorized rounds: a key whose slot no other remaining key can
+    # use takes it, which never blocks another key
+    while len(alive):
+        uu, ww = u[alive], w[alive]
+        leaf_u = degree[uu] == 1
+        leaf_w = ~leaf_u & (degree[ww] == 1)
+        peeled = leaf_u | leaf_w
+        if not peeled.any():
+            break
+        slot[alive[leaf_u]] = uu[leaf_u]
+        slot[alive[leaf_w]] = ww[leaf_w]
+        np.subtract.at(degree, uu[peeled], 1)
+        np.subtract.at(degree, ww[peeled], 1)
+        alive = alive[~peeled]
+
+    # What is left is placeable only if it is a union of cycles
+    if len(alive) == 0:
+        return slot
+    if (degree[u[alive]] != 2).any() or (degree[w[alive]] != 2).any():
+        return None
+    incident = {}
+    for e, a, b in zip(alive.tolist(), u[alive].tolist(), w[alive].tolist()):
+        incident.setdefault(a, []).append(e)
+        incident.setdefault(b, []).append(e)
+    ends = dict(zip(alive.tolist(), zip(u[alive].tolist(), w[alive].tolist())))
+    for first in alive.tolist():
+        # Walk the cycle, placing each key in the slot it shares with the next
+        e, v = first, ends[first][1]
+        while slot[e] < 0:
+            slot[e] = v
+            a, b = incident[v]
+            e = b if a == e else a
+            v = ends[e][0] if ends[e][1] == v else ends[e][1]
+    return slot
+
+
+class _MappedSlots:
+    """Read-only view of one table of a mapped file, indexed like a list."""
+    def __setitem__(self, i: int, value):
+        raise TypeError("table is read-only (loaded with mmap=True)")
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+    def __repr__(self) -> str:
+        return repr(list(self))
+
+
+class _MappedIntSlots(_MappedSlots):
+    """Fixed-width int64 slots with an occupancy byte each."""
+    def __init__(self, keys: np.ndarray, occupied: np.ndarray):
+        self._keys = keys
+        self._occupied = occupied
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __getitem__(self, i: int):
+        return int(self._keys[i]) if self._occupied[i] else None
+
+    def __iter__(self):
+        for key, occupied in zip(self._keys.tolist(), self._occupied.tolist()):
+            yield key if occupied else None
+
+
+class _MappedArenaSlots(_MappedSlots):
+    """Slots whose keys live in an offset-indexed key arena."""
+    def __init__(self, offsets: np.ndarray, arena: memoryview):
+        self._offsets = offsets
+        self._arena = arena
+
+    def __len__(self) -> int:
+        return len(self._offsets) - 1
+
+    def __getitem__(self, i: int):
+        start, end = int(self._offsets[i]), int(self._offsets[i + 1])
+        return _decode_arena_key(self._arena[start:end]) if end > start else None
+
 
 class CuckooHashTable:
-    def __init__(self, size: int = 11, max_displacements: int = 10):
+    """
+    Cuckoo hash table over two tables of size slots.
+
+    family selects the two hash functions (see tabulation_hashes.families):
+    the name of a built-in family ("twisted" by default), a hasher class or a
+    factory(seed). They are seeded with seed and seed + 1, where seed is
+    random unless given.
+    """
+    def __init__(self, size: int = 11, max_displacements: int = 10, seed: int = None,
+                 family: Family = "twisted"):
         if not isinstance(size, int) or size <= 0:
             raise TypeError(f"size must be a positive integer")
         
@@ -14,40 +151,326 @@ class CuckooHashTable:
         self.max_displacements = max_displacements
         self.table1 = [None] * size
         self.table2 = [None] * size
-        self.hash1 = TwistedTabulationHash(seed=1)
-        self.hash2 = TwistedTabulationHash(seed=2)
+        if seed is None:
+            seed = secrets.randbits(32)
+        if not isinstance(seed, int):
+            raise TypeError(f"seed must be an integer")
+
+        self._seeds = (seed, seed + 1)
+        self._family = family
+        self.hash1, self.hash2 = make_hashers(family, seed, 2)
+        self._stats = None
+        self._slot_codes = None
+
+    @classmethod
+    def from_keys(cls, keys: Iterable, load: float = 0.4, max_displacements: int = 10,
+                  max_attempts: int = 10, growth: float = 1.1, seed: int = None,
+                  family: Family = "twisted") -> "CuckooHashTable":
+        """
+        Builds a table holding keys (duplicates are stored once) without
+        evictions. All keys are hashed in one vectorized pass and placed
+        offline: the cuckoo graph is peeled from its leaves and the cycles
+        left, if any, are oriented so every key gets a slot of its own.
+        - load: Target load factor over both tables, which sets size.
+        - seed, family: As in the constructor.
+        - max_attempts: Placements tried, growing size by growth after each
+          failure (a component of the graph with more keys than slots).
+        Raises ValueError if no attempt places every key, e.g. when three
+        keys share the 64-bit code the hashes read.
+        """
+        if not isinstance(load, (int, float)) or not 0 < load <= 0.5:
+            raise TypeError("load must be a number in (0, 0.5]")
+        if not isinstance(max_attempts, int) or max_attempts <= 0:
+            raise TypeError("max_attempts must be a positive integer")
+        if isinstance(keys, np.ndarray):
+            keys = np.unique(keys)
+            codes = keys_to_array(keys)
+            exact = keys.dtype.kind == "i"
+            keys = keys.tolist()
+        else:
+            keys = list(dict.fromkeys(keys))
+            codes = keys_to_array(keys)
+            exact = None
+
+        size = max(1, math.ceil(len(keys) / (2 * load)))
+        table = cls(size=size, max_displacements=max_displacements, seed=seed, family=family)
+        # The final table must hash with the same (possibly random) seed
+        seed = table._seeds[0]
+        h1, h2 = table.hash1.hash_many(codes), table.hash2.hash_many(codes)
+        for _ in range(max_attempts):
+            u = (h1 % np.uint64(size)).astype(np.int64)
+            w = (h2 % np.uint64(size)).astype(np.int64) + size
+            slot = _orient(u, w, 2 * size)
+            if slot is not None:
+                break
+            size = math.ceil(size * growth)
+        else:
+            raise ValueError(f"could not place {len(keys)} keys in {max_attempts} attempts")
+
+        table = cls(size=size, max_displacements=max_displacements, seed=seed, family=family)
+        slots = np.full(2 * size, None, dtype=object)
+        slots[slot] = keys
+        table.table1, table.table2 = slots[:size].tolist(), slots[size:].tolist()
+
+        slot_codes = np.zeros(2 * size, dtype=np.uint64)
+        slot_codes[slot] = codes
+        occupied = np.zeros(2 * size, dtype=bool)
+        occupied[slot] = True
+        if exact is None:
+            exact = all(type(key) is int and _INT64_MIN <= key <= _INT64_MAX for key in keys)
+        table._slot_codes = (slot_codes, occupied, exact)
+        return table
 
     def _position(self, key, which_hash):
         h = self.hash1 if which_hash == 1 else self.hash2
-        return h.hash(key) % self.size
+        return h.hash(key_to_int(key) & MASK64) % self.size
 
     def insert(self, key: Union[int, str, bytes]) -> bool:
+        self._slot_codes = None
+        stats = self._stats
+        start = time.perf_counter() if stats is not None and stats.hook else 0.0
         use_first = True
         displaced = key
+        evictions = 0
+        success = False
         for _ in range(self.max_displacements):
             if use_first:
                 pos = self._position(displaced, 1)
                 if self.table1[pos] is None:
                     self.table1[pos] = displaced
-                    return True
+                    success = True
+                    break
                 displaced, self.table1[pos] = self.table1[pos], displaced
             else:
                 pos = self._position(displaced, 2)
                 if self.table2[pos] is None:
                     self.table2[pos] = displaced
-                    return True
+                    success = True
+                    break
                 displaced, self.table2[pos] = self.table2[pos], displaced
             # Alternar tabla
             use_first = not use_first
+            evictions += 1
 
-        # Rehashing needed
-        return False
+        if stats is not None:
+            probes = evictions + 1 if success else evictions
+            stats.count("insert")
+            stats.count("hash_calls", probes)
+            stats.count("probes", probes)
+            stats.count("evictions", evictions)
+            stats.record("eviction_chain_lengths", evictions)
+            if not success:
+                stats.count("failed_inserts")
+            if stats.hook:
+                stats.observe("insert", key, time.perf_counter() - start, evictions=evictions, success=success)
+        # Rehashing needed when not successful
+        return success
 
     def contains(self, key: Union[int, str, bytes]) -> bool:
-        return (
-            self.table1[self._position(key, 1)] == key or
-            self.table2[self._position(key, 2)] == key
-        )
+        stats = self._stats
+        start = time.perf_counter() if stats is not None and stats.hook else 0.0
+        key_int = key_to_int(key) & MASK64
+        probes = 1
+        found = self.table1[self.hash1.hash(key_int) % self.size] == key
+        if not found:
+            probes = 2
+            found = self.table2[self.hash2.hash(key_int) % self.size] == key
+
+        if stats is not None:
+            stats.count("contains")
+            stats.count("hash_calls", probes)
+            stats.count("probes", probes)
+            if found:
+                stats.count("contains_positive")
+            if stats.hook:
+                stats.observe("contains", key, time.perf_counter() - start, probes=probes, found=found)
+        return found
+
+    def _slot_code_arrays(self):
+        """
+        64-bit codes and occupancy of table1 followed by table2, and whether
+        equal codes imply equal keys for int64 queries (every key an int64
+        int). Cached until the next insert.
+        """
+        if self._slot_codes is None:
+            if isinstance(self.table1, _MappedIntSlots):
+                slot_codes = np.concatenate([self.table1._keys, self.table2._keys]).view(np.uint64)
+                occupied = np.concatenate([self.table1._occupied, self.table2._occupied]).astype(bool)
+                exact = True
+            else:
+                slots = list(self.table1) + list(self.table2)
+                occupied = np.array([key is not None for key in slots], dtype=bool)
+                slot_codes = np.fromiter((0 if key is None else key_to_int(key) & MASK64 for key in slots),
+                                         dtype=np.uint64, count=len(slots))
+                exact = all(type(key) is int and _INT64_MIN <= key <= _INT64_MAX
+                            for key in slots if key is not None)
+            self._slot_codes = (slot_codes, occupied, exact)
+        return self._slot_codes
+
+    def contains_many(self, keys) -> np.ndarray:
+        """
+        Vectorized contains(). Both candidate slots of every key are probed
+        at once by comparing 64-bit codes; keys whose code matches are then
+        compared for equality, unless keys is a signed integer array and the
+        table holds only int64 keys, where equal codes mean equal keys.
+        Returns a bool array.
+        """
+        if not isinstance(keys, (list, tuple, np.ndarray)):
+            # Keys are read twice: once for their codes, once to compare them
+            keys = list(keys)
+        codes = keys_to_array(keys)
+        slot_codes, occupied, exact = self._slot_code_arrays()
+        size = np.uint64(self.size)
+        pos1 = (self.hash1.hash_many(codes) % size).astype(np.intp)
+        pos2 = (self.hash2.hash_many(codes) % size).astype(np.intp) + self.size
+        hit1 = occupied[pos1] & (slot_codes[pos1] == codes)
+        hit2 = occupied[pos2] & (slot_codes[pos2] == codes)
+        found = hit1 | hit2
+        if exact and isinstance(keys, np.ndarray) and keys.dtype.kind == "i":
+            return found
+
+        # Equal codes, different keys: e.g. str keys sharing their last 8 bytes
+        for i in np.flatnonzero(found).tolist():
+            key = keys[i]
+            found[i] = ((hit1[i] and self.table1[pos1[i]] == key) or
+                        (hit2[i] and self.table2[pos2[i] - self.size] == key))
+        return found
+
+    @property
+    def family(self) -> Family:
+        return self._family
+
+    def positions(self, key: Union[int, str, bytes]) -> Tuple[int, int]:
+        """Candidate slots of key in table1 and table2."""
+        return self._position(key, 1), self._position(key, 2)
+
+    def occupancy(self) -> int:
+        """Number of occupied slots over both tables."""
+        return sum(slot is not None for slot in self.table1) + sum(slot is not None for slot in self.table2)
+
+    def load_factor(self) -> float:
+        return self.occupancy() / (2 * self.size)
+
+    # Instrumentation
+    def enable_stats(self, hook=None, slow_threshold: float = 0.0) -> "CuckooHashTable":
+        """
+        Starts counting insert() and contains() calls. Without stats they
+        only pay one None check.
+        - hook: Optional callable receiving a dict for each slow operation.
+        - slow_threshold: Seconds an operation must take to reach the hook.
+        """
+        self._stats = OperationStats(hook, slow_threshold)
+        return self
+
+    def disable_stats(self) -> "CuckooHashTable":
+        self._stats = None
+        return self
+
+    def stats(self) -> dict:
+        """Snapshot of the table state plus the operation counters, if enabled."""
+        occupied = self.occupancy()
+        snap = {
+            "enabled": self._stats is not None,
+            "size": self.size,
+            "occupied": occupied,
+            "load_factor": occupied / (2 * self.size),
+        }
+        if self._stats is not None:
+            snap.update(self._stats.snapshot())
+        return snap
+
+    # Persistence
+    def save(self, path) -> None:
+        """
+        Writes the table to path keeping its hash seeds, size and slot
+        layout, so load() needs no rehashing or evictions. Tables whose keys
+        are all int64 integers use fixed-width slots; tables with str, bytes
+        or larger int keys store them in an offset-indexed key arena. A
+        custom hasher family is not stored: pass it again to load().
+        """
+        # NumPy integer keys (e.g. insert(np.int64(...))) are stored as ints
+        slots = [int(key) if isinstance(key, np.integer) else key
+                 for key in list(self.table1) + list(self.table2)]
+        keys = [key for key in slots if key is not None]
+        int_layout = all(type(key) is int and _INT64_MIN <= key <= _INT64_MAX for key in keys)
+
+        with open(path, "wb") as f:
+            f.write(_FILE_HEADER.pack(_FILE_MAGIC, _INT_LAYOUT if int_layout else _ARENA_LAYOUT,
+                                      self.size, self.max_displacements, *self._seeds,
+                                      (family_name(self._family) or "").encode()))
+            if int_layout:
+                occupied = np.array([key is not None for key in slots], dtype=np.uint8)
+                values = np.array([0 if key is None else key for key in slots], dtype="<i8")
+                f.write(values.tobytes())
+                f.write(occupied.tobytes())
+            else:
+                encoded = [b"" if key is None else _encode_arena_key(key) for key in slots]
+                offsets = np.zeros(len(slots) + 1, dtype="<u8")
+                np.cumsum([len(e) for e in encoded], out=offsets[1:])
+                f.write(offsets.tobytes())
+                f.write(b"".join(encoded))
+
+    @classmethod
+    def load(cls, path, mmap: bool = True, family: Family = None) -> "CuckooHashTable":
+        """
+        Reads a table written by save().
+        - mmap: If True (default), the file is memory-mapped and the table is
+          read-only: loading is O(1) and processes mapping the same file share
+          it through the page cache. If False, the slots are read into lists
+          and the table accepts inserts.
+        - family: Only needed (and then required) for tables saved with a
+          custom hasher family.
+        """
+        with open(path, "rb") as f:
+            if mmap:
+                data = _mmap.mmap(f.fileno(), 0, access=_mmap.ACCESS_READ)
+            else:
+                data = f.read()
+        if len(data) < _FILE_HEADER.size or data[:4] != _FILE_MAGIC:
+            raise ValueError(f"{path} is not a saved CuckooHashTable")
+        _, layout, size, max_displacements, seed1, seed2, saved = _FILE_HEADER.unpack_from(data, 0)
+        saved = saved.rstrip(b"\0").decode()
+        if family is None:
+            if not saved:
+                raise ValueError(f"{path} was saved with a custom hasher family; pass it as family")
+            family = saved
+        elif saved and family_name(family) != saved:
+            raise ValueError(f"{path} was saved with the {saved!r} family, not {family!r}")
+
+        pos = _FILE_HEADER.size
+        if layout == _INT_LAYOUT:
+            expected = pos + 2 * size * 9
+            if len(data) != expected:
+                raise ValueError(f"{path} is truncated: expected {expected} bytes")
+            values = np.frombuffer(data, dtype="<i8", count=2 * size, offset=pos)
+            occupied = np.frombuffer(data, dtype=np.uint8, count=2 * size, offset=pos + 16 * size)
+            tables = [_MappedIntSlots(values[:size], occupied[:size]),
+                      _MappedIntSlots(values[size:], occupied[size:])]
+        elif layout == _ARENA_LAYOUT:
+            offsets = np.frombuffer(data, dtype="<u8", count=2 * size + 1, offset=pos)
+            arena = memoryview(data)[pos + offsets.nbytes:]
+            if len(arena) != int(offsets[-1]):
+                raise ValueError(f"{path} is truncated: expected {int(offsets[-1])} bytes of keys")
+            # Offsets are absolute in the shared arena, so both tables are views
+            tables = [_MappedArenaSlots(offsets[:size + 1], arena),
+                      _MappedArenaSlots(offsets[size:], arena)]
+        else:
+            raise ValueError(f"{path} has an unknown slot layout {layout}")
+
+        table = cls.__new__(cls)
+        table.size = size
+        table.max_displacements = max_displacements
+        table.table1, table.table2 = tables if mmap else [list(t) for t in tables]
+        table._seeds = (seed1, seed2)
+        table._family = family
+        table.hash1, table.hash2 = make_hashers(family, seed1, 1) + make_hashers(family, seed2, 1)
+        table._stats = None
+        table._slot_codes = None
+        return table
+
+    @property
+    def read_only(self) -> bool:
+        return not isinstance(self.table1, list)
 
     def __str__(self):
         return (f"Tabla1: {self.table1}\n"
@@ -0,0 +1,208 @@
+"""False positive rate experiments for the approximate-membership structures.
+
+A trial builds a structure from a factory, inserts random 64-bit keys in
+fill_steps increments up to its capacity and, after every increment, queries
+num_queries fresh keys that were never inserted. Inserted keys are kept in a
+hash set so excluding them from the queries is O(1) per query; queries are
+generated and evaluated in bulk through add_many()/contains_many() when the
+structure has them ("batch" mode) or one key at a time ("scalar" mode).
+
+Trials for different seeds run in a process pool and are aggregated into the
+pooled empirical rate, a Wilson confidence interval and the spread across
+seeds, next to the theoretical rate when the structure reports one.
+
+Factories are called as factory(capacity, tolerance, seed), or with a
+family keyword when a sweep is given hasher families to compare, and must be
+picklable (module-level functions or classes) to run in the pool.
+"""
+import csv
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from itertools import product
+from typing import Callable, Dict, Iterable, List, Optional
+import numpy as np
+from scipy.stats import norm
+from structures.cuckoo_hashing import CuckooHashTable
+from structures.tabulated_bloom_filter import BloomFilter
+from tabulation_hashes.families import Family, family_name
+
+NUM_QUERIES = 100000
+FILL_STEPS = 10
+CONFIDENCE = 0.95
+
+FIELDS = [
+    "structure", "family", "mode", "capacity", "tolerance", "inserted", "seeds", "queries",
+    "false_positives", "empirical_fpr", "ci_low", "ci_high", "seed_std", "theoretical_fpr",
+]
+
+
+def bloom_factory(capacity: int, tolerance: float, seed: int, family: str = "simple") -> BloomFilter:
+    return BloomFilter(max_size=capacity, max_tolerance=tolerance, seed=seed, family=family)
+
+
+def cuckoo_factory(capacity: int, tolerance: float, seed: int, family: str = "twisted") -> CuckooHashTable:
+    # Exact membership: tolerance is ignored, the table is sized for load 0.4
+    return CuckooHashTable(size=int(capacity / 0.8) + 1, max_displacements=50, seed=seed, family=family)
+
+
+STRUCTURES = {
+    "bloom": bloom_factory,
+    "cuckoo": cuckoo_factory,
+}
+
+
+def wilson_interval(successes: int, trials: int, confidence: float = CONFIDENCE):
+    """Wilson score interval for a binomial proportion."""
+    if trials == 0:
+        return 0.0, 1.0
+    z = float(norm.ppf(0.5 + confidence / 2))
+    p = successes / trials
+    denom = 1 + z * z / trials
+    center = (p + z * z / (2 * trials)) / denom
+    half = z * math.sqrt(p * (1 - p) / trials + z * z / (4 * trials * trials)) / denom
+    low = 0.0 if successes == 0 else max(0.0, center - half)
+    high = 1.0 if successes == trials else min(1.0, center + half)
+    return low, high
+
+
+def _insert(structure, keys: np.ndarray, mode: str) -> None:
+    if mode == "batch" and hasattr(structure, "add_many"):
+        structure.add_many(keys)
+        return
+    add = getattr(structure, "add", None) or structure.insert
+    for key in keys.tolist():
+        add(key)
+
+
+def _query(structure, keys: np.ndarray, mode: str) -> int:
+    if mode == "batch" and hasattr(structure, "contains_many"):
+        return int(np.count_nonzero(structure.contains_many(keys)))
+    contains = structure.contains
+    return sum(1 for key in keys.tolist() if contains(key))
+
+
+def random_keys(rng: np.random.Generator, n: int) -> np.ndarray:
+    """n random 64-bit keys as signed integers, so the scalar path accepts them too."""
+    return rng.integers(np.iinfo(np.int64).min, np.iinfo(np.int64).max, size=n, dtype=np.int64, endpoint=True)
+
+
+def fresh_queries(rng: np.random.Generator, n: int, inserted: set) -> np.ndarray:
+    """n random 64-bit keys, none of which is in inserted."""
+    queries = np.empty(0, dtype=np.int64)
+    while len(queries) < n:
+        batch = random_keys(rng, n - len(queries))
+        keep = np.fromiter((int(k) not in inserted for k in batch.tolist()), dtype=bool, count=len(batch))
+        queries = np.concatenate([queries, batch[keep]])
+    return queries
+
+
+def _family_label(family) -> str:
+    if family is None:
+        return ""
+    return family_name(family) or getattr(family, "__name__", repr(family))
+
+
+def run_trial(factory: Callable, capacity: int, tolerance: float, seed: int, mode: str = "batch",
+              num_queries: int = NUM_QUERIES, fill_steps: int = FILL_STEPS,
+              family: Optional[Family] = None) -> List[dict]:
+    """
+    One row per fill level: hasher family, inserted count, false positives
+    and theoretical rate. family=None keeps the factory's default family.
+    """
+    rng = np.random.default_rng(seed)
+    # Hashers are seeded with consecutive integers, so passing the trial seeds
+    # 0, 1, ... straight through would make trials share hash functions
+    structure_seed = int(rng.integers(1 << 32))
+    if family is None:
+        structure = factory(capacity, tolerance, structure_seed)
+    else:
+        structure = factory(capacity, tolerance, structure_seed, family=family)
+    label = _family_label(getattr(structure, "family", family))
+    keys = random_keys(rng, capacity)
+    inserted = set()
+
+    rows = []
+    bounds = np.linspace(0, capacity, fill_steps + 1).astype(int)
+    for lo, hi in zip(bounds[:-1], bounds[1:]):
+        step = keys[lo:hi]
+        _insert(structure, step, mode)
+        inserted.update(step.tolist())
+
+        queries = fresh_queries(rng, num_queries, inserted)
+        theoretical = getattr(structure, "false_positive_probability", None)
+        rows.append({
+            "family": label,
+            "inserted": int(hi),
+            "queries": num_queries,
+            "false_positives": _query(structure, queries, mode),
+            "theoretical_fpr": theoretical() if theoretical else 0.0,
+        })
+    return rows
+
+
+def aggregate(trials: List[List[dict]], confidence: float = CONFIDENCE) -> List[dict]:
+    """Combines the rows of several seeds, fill level by fill level."""
+    rows = []
+    for levels in zip(*trials):
+        false_positives = sum(level["false_positives"] for level in levels)
+        queries = sum(level["queries"] for level in levels)
+        rates = [level["false_positives"] / level["queries"] for level in levels]
+        low, high = wilson_interval(false_positives, queries, confidence)
+        rows.append({
+            "family": levels[0]["family"],
+            "inserted": levels[0]["inserted"],
+            "seeds": len(levels),
+            "queries": queries,
+            "false_positives": false_positives,
+            "empirical_fpr": false_positives / queries,
+            "ci_low": low,
+            "ci_high": high,
+            "seed_std": float(np.std(rates, ddof=1)) if len(rates) > 1 else 0.0,
+            "theoretical_fpr": float(np.mean([level["theoretical_fpr"] for level in levels])),
+        })
+    return rows
+
+
+def sweep(structures: Optional[Dict[str, Callable]] = None, capacities: Iterable[int] = (1000,),
+          tolerances: Iterable[float] = (0.01,), modes: Iterable[str] = ("batch",),
+          families: Iterable[Optional[Family]] = (None,), seeds: Iterable[int] = range(10), num_queries: int = NUM_QUERIES, fill_steps: int = FILL_STEPS,
+          workers: Optional[int] = None, csv_path: Optional[str] = None,
+          confidence: float = CONFIDENCE) -> List[dict]:
+    """
+    Runs every combination of structure, hasher family, capacity, tolerance
+    and mode over all seeds and returns the aggregated rows (also written to
+    csv_path if given). A family of None uses the factory's default.
+    workers=None uses every CPU; workers=1 runs in this process.
+    """
+    structures = structures or STRUCTURES
+    seeds = list(seeds)
+    configs = list(product(structures.items(), families, capacities, tolerances, modes))
+    tasks = [(config, seed) for config in configs for seed in seeds]
+
+    def run(task):
+        ((_, factory), family, capacity, tolerance, mode), seed = task
+        return partial(run_trial, factory, capacity, tolerance, seed, mode, num_queries, fill_steps, family)
+
+    if workers == 1:
+        trials = [run(task)() for task in tasks]
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run(task)) for task in tasks]
+            trials = [future.result() for future in futures]
+
+    results = []
+    for i, ((name, _), _, capacity, tolerance, mode) in enumerate(configs):
+        config_trials = trials[i * len(seeds):(i + 1) * len(seeds)]
+        for row in aggregate(config_trials, confidence):
+            row.update({"structure": name, "mode": mode, "capacity": capacity, "tolerance": tolerance})
+            results.append(row)
+
+    if csv_path is not None:
+        os.makedirs(os.path.dirname(csv_path) or ".", exist_ok=True)
+        with open(csv_path, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(results)
+    return results
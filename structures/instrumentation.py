@@ -0,0 +1,50 @@
+from collections import Counter
+from typing import Callable, Optional
+
+class OperationStats:
+    """
+    Operation counters for an instrumented structure.
+
+    Structures only create one of these when instrumentation is enabled and
+    check for it at their counting points, so a structure without stats
+    skips the counting entirely.
+
+    - hook: Optional callable receiving a dict for every operation that takes
+      at least slow_threshold seconds. Operations are only timed when a hook
+      is set.
+    - slow_threshold: Minimum duration in seconds reported to the hook
+      (default: 0.0, every operation).
+    """
+    def __init__(self, hook: Optional[Callable[[dict], None]] = None, slow_threshold: float = 0.0):
+        if hook is not None and not callable(hook):
+            raise TypeError("hook must be callable")
+        if not isinstance(slow_threshold, (int, float)) or slow_threshold < 0:
+            raise TypeError("slow_threshold must be a non-negative number")
+        self.hook = hook
+        self.slow_threshold = slow_threshold
+        self.counters = Counter()
+        self.histograms = {}
+
+    def count(self, name: str, amount: int = 1) -> None:
+        self.counters[name] += amount
+
+    def record(self, histogram: str, value: int) -> None:
+        """Adds one observation of value to the named histogram."""
+        self.histograms.setdefault(histogram, Counter())[value] += 1
+
+    def observe(self, op: str, key, elapsed: float, **details) -> None:
+        """Reports an operation to the hook if it was slow enough."""
+        if elapsed >= self.slow_threshold:
+            event = {"op": op, "key": key, "elapsed": elapsed}
+            event.update(details)
+            self.hook(event)
+
+    def snapshot(self) -> dict:
+        snap = dict(self.counters)
+        for name, hist in self.histograms.items():
+            snap[name] = dict(sorted(hist.items()))
+        return snap
+
+    def reset(self) -> None:
+        self.counters.clear()
+        self.histograms.clear()
@@ -0,0 +1,261 @@
+"""Static minimal perfect hash index (BDZ) built on twisted tabulation hashing.
+
+Every key is an edge between three vertices, one in each third of a vertex
+set of about 1.23 n vertices, chosen by three seeded TwistedTabulationHash
+functions. If the resulting 3-hypergraph can be peeled (repeatedly removing
+an edge that is the only one on some vertex, which happens with high
+probability at this size), each key gets its own "free" vertex and a 2-bit
+value g per vertex is chosen so that (g[v0] + g[v1] + g[v2]) % 3 selects it.
+Otherwise the build retries with new seeds.
+
+A lookup is three g probes and a rank over the assigned vertices, which maps
+the free vertex to [0, n): the index is minimal and can address a dense
+value array directly. g takes 2 bits per vertex and the rank one uint32 per
+block of 64 vertices, about 3.1 bits per key.
+
+The index does not store the keys: a key that was not in the build set gets
+an arbitrary index in [0, n).
+"""
+import math
+import mmap as _mmap
+import struct
+from typing import Iterable, Optional, Sequence
+import numpy as np
+from tabulation_hashes.twisted_tabulation_hash import TwistedTabulationHash
+from tabulation_hashes.codecs import MASK64, key_to_int, keys_to_array
+
+GAMMA = 1.23
+MAX_ATTEMPTS = 20
+BLOCK = 64  # Vertices per rank block
+_BLOCK_BYTES = BLOCK // 4
+_UNASSIGNED = 3
+
+_FILE_MAGIC = b"TPH1"
+# magic, num_keys, part_size, seed, has_values, value dtype
+_FILE_HEADER = struct.Struct("<4sQQqB7x16s")
+
+# Number of 2-bit fields of a byte that are assigned (!= 3), and the same for
+# its lowest k fields
+_ASSIGNED_IN_BYTE = np.array([sum(((b >> (2 * i)) & 3) != _UNASSIGNED for i in range(4))
+                              for b in range(256)], dtype=np.int64)
+_ASSIGNED_PREFIX = np.array([[sum(((b >> (2 * i)) & 3) != _UNASSIGNED for i in range(k))
+                              for k in range(4)] for b in range(256)], dtype=np.int64)
+
+
+def _hashers(seed: int):
+    # c=8 so the whole 64-bit key code reaches the hash
+    return [TwistedTabulationHash(c=8, r=8, seed=seed + i) for i in range(3)]
+
+
+def _peel(edges: np.ndarray, num_vertices: int) -> Optional[list]:
+    """Peeling order as (edge, free vertex) pairs, or None if the graph has a 2-core."""
+    flat = edges.ravel()
+    degree = np.bincount(flat, minlength=num_vertices)
+    edge_xor = np.zeros(num_vertices, dtype=np.int64)
+    np.bitwise_xor.at(edge_xor, flat, np.repeat(np.arange(len(edges)), 3))
+    degree, edge_xor, edge_list = degree.tolist(), edge_xor.tolist(), edges.tolist()
+
+    order = []
+    stack = [v for v in range(num_vertices) if degree[v] == 1]
+    while stack:
+        v = stack.pop()
+        if degree[v] != 1:
+            continue
+        e = edge_xor[v]
+        order.append((e, v))
+        for u in edge_list[e]:
+            edge_xor[u] ^= e
+            degree[u] -= 1
+            if degree[u] == 1:
+                stack.append(u)
+    return order if len(order) == len(edges) else None
+
+
+class PerfectHashIndex:
+    """
+    Frozen minimal perfect hash of a static key set, with an optional value
+    array. Build it with PerfectHashIndex.build(); index(key) returns the
+    position of key in [0, len(index)).
+    """
+    def __init__(self, g: np.ndarray, ranks: np.ndarray, num_keys: int, part_size: int,
+                 seed: int, values: Optional[np.ndarray] = None):
+        self._ranks = ranks
+        self._num_keys = num_keys
+        self._part_size = part_size
+        self._seed = seed
+        self._values = values
+        self._hashes = _hashers(seed)
+        self._g_bytes = g.tobytes() if isinstance(g, np.ndarray) else g
+
+    @classmethod
+    def build(cls, keys: Iterable, values: Optional[Sequence] = None, seed: int = 0,
+              gamma: float = GAMMA, max_attempts: int = MAX_ATTEMPTS) -> "PerfectHashIndex":
+        """
+        Builds the index of keys.
+        - values: Optional sequence aligned with keys; get(key) returns the
+          value of key. Must convert to a fixed-size NumPy dtype.
+        - seed: First hash seed; every retry moves to the next three seeds.
+        - gamma: Vertices per key (>= 1.23 for peeling to succeed w.h.p.).
+        Raises ValueError if two keys have the same 64-bit code (duplicates,
+        or keys equal in their last 8 bytes) or if no seeds work.
+        """
+        if not isinstance(gamma, (int, float)) or gamma < 1.0:
+            raise TypeError("gamma must be a number >= 1")
+        if not isinstance(max_attempts, int) or max_attempts <= 0:
+            raise TypeError("max_attempts must be a positive integer")
+        if not isinstance(keys, (list, tuple, np.ndarray)):
+            keys = np.asarray(keys) if hasattr(keys, "__array__") else list(keys)
+        codes = keys_to_array(keys)
+        n = len(codes)
+        if n == 0:
+            raise ValueError("cannot build a perfect hash of an empty key set")
+        if len(np.unique(codes)) != n:
+            raise ValueError("keys must be distinct in their 64-bit codes (their last 8 bytes for str/bytes)")
+        if values is not None:
+            values = np.asarray(values)
+            if len(values) != n:
+                raise ValueError(f"values has {len(values)} items for {n} keys")
+            if values.dtype.hasobject:
+                raise TypeError("values must convert to a fixed-size NumPy dtype")
+
+        # A little slack so that tiny key sets peel too
+        part_size = math.ceil(gamma * n / 3) + 2
+        num_vertices = 3 * part_size
+        for attempt in range(max_attempts):
+            attempt_seed = seed + 3 * attempt
+            edges = np.empty((n, 3), dtype=np.int64)
+            for i, h in enumerate(_hashers(attempt_seed)):
+                edges[:, i] = (h.hash_many(codes) % np.uint64(part_size)).astype(np.int64) + i * part_size
+            order = _peel(edges, num_vertices)
+            if order is not None:
+                break
+        else:
+            raise ValueError(f"could not build a perfect hash in {max_attempts} attempts")
+
+        # Assign in reverse peeling order: each edge's free vertex is the
+        # last of its vertices to be set, so the sum can still select it
+        g = [_UNASSIGNED] * num_vertices
+        edge_list = edges.tolist()
+        for e, v in reversed(order):
+            a, b, c = edge_list[e]
+            j = (a, b, c).index(v)
+            g[v] = (j - g[a] - g[b] - g[c] + g[v]) % 3
+
+        g = np.array(g, dtype=np.uint8)
+        packed = np.full(math.ceil(num_vertices / 4), 0xFF, dtype=np.uint8)
+        for k in range(4):
+            fields = g[k::4]
+            packed[:len(fields)] &= ~np.uint8(3 << (2 * k)) | (fields << np.uint8(2 * k))
+        assigned = np.concatenate([[0], np.cumsum(g != _UNASSIGNED)])
+        ranks = assigned[::BLOCK].astype(np.uint32)
+
+        # Values are stored in index order
+        if values is not None:
+            indexed = np.empty_like(values)
+            index = cls(packed, ranks, n, part_size, attempt_seed)
+            indexed[index.index_many(codes)] = values
+            values = indexed
+        return cls(packed, ranks, n, part_size, attempt_seed, values)
+
+    def __len__(self) -> int:
+        return self._num_keys
+
+    @property
+    def seed(self) -> int:
+        return self._seed
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes used by the index itself (without values)."""
+        return len(self._g_bytes) + self._ranks.nbytes
+
+    def bits_per_key(self) -> float:
+        return 8 * self.nbytes / self._num_keys
+
+    def _g_at(self, v: int) -> int:
+        return (self._g_bytes[v >> 2] >> ((v & 3) << 1)) & 3
+
+    def _rank(self, v: int) -> int:
+        block = v // BLOCK
+        start = block * _BLOCK_BYTES
+        fields = v - block * BLOCK
+        # Fields equal to 3 have both bits set
+        bits = int.from_bytes(self._g_bytes[start:(v >> 2) + 1], byteorder="little") & ((1 << (2 * fields)) - 1)
+        unassigned = bin(bits & (bits >> 1) & 0x5555555555555555555555555555555555555555).count("1")
+        return int(self._ranks[block]) + fields - unassigned
+
+    def index(self, key) -> int:
+        """Position of key in [0, len(self)). Arbitrary for keys outside the build set."""
+        code = key_to_int(key) & MASK64
+        part = self._part_size
+        v0 = self._hashes[0].hash(code) % part
+        v1 = self._hashes[1].hash(code) % part + part
+        v2 = self._hashes[2].hash(code) % part + 2 * part
+        j = (self._g_at(v0) + self._g_at(v1) + self._g_at(v2)) % 3
+        return self._rank((v0, v1, v2)[j])
+
+    def index_many(self, keys) -> np.ndarray:
+        """Vectorized index(). Returns an int64 array."""
+        codes = keys_to_array(keys)
+        part = np.uint64(self._part_size)
+        g = np.frombuffer(self._g_bytes, dtype=np.uint8)
+        vertices = np.empty((3, len(codes)), dtype=np.int64)
+        for i, h in enumerate(self._hashes):
+            vertices[i] = (h.hash_many(codes) % part).astype(np.int64) + i * self._part_size
+        fields = (g[vertices >> 2] >> ((vertices & 3) << 1).astype(np.uint8)) & 3
+        j = fields.astype(np.int64).sum(axis=0) % 3
+        v = vertices[j, np.arange(len(codes))]
+
+        block = v // BLOCK
+        rank = self._ranks[block].astype(np.int64)
+        first_byte = block * _BLOCK_BYTES
+        last_byte = v >> 2
+        for k in range(_BLOCK_BYTES):
+            inside = first_byte + k < last_byte
+            rank += np.where(inside, _ASSIGNED_IN_BYTE[g[np.where(inside, first_byte + k, 0)]], 0)
+        rank += _ASSIGNED_PREFIX[g[last_byte], v & 3]
+        return rank
+
+    def get(self, key):
+        """Value of key. Requires the index to have been built with values."""
+        if self._values is None:
+            raise ValueError("index was built without values")
+        return self._values[self.index(key)].item()
+
+    def get_many(self, keys) -> np.ndarray:
+        if self._values is None:
+            raise ValueError("index was built without values")
+        return self._values[self.index_many(keys)]
+
+    # Persistence
+    def save(self, path) -> None:
+        """Writes the header, packed g, rank blocks and values (if any) to path."""
+        dtype = self._values.dtype.str.encode() if self._values is not None else b""
+        with open(path, "wb") as f:
+            f.write(_FILE_HEADER.pack(_FILE_MAGIC, self._num_keys, self._part_size, self._seed,
+                                      self._values is not None, dtype))
+            f.write(self._g_bytes)
+            f.write(self._ranks.astype("<u4").tobytes())
+            if self._values is not None:
+                f.write(self._values.tobytes())
+
+    @classmethod
+    def load(cls, path, mmap: bool = True) -> "PerfectHashIndex":
+        """Reads an index written by save(), memory-mapped by default."""
+        with open(path, "rb") as f:
+            data = _mmap.mmap(f.fileno(), 0, access=_mmap.ACCESS_READ) if mmap else f.read()
+        if len(data) < _FILE_HEADER.size or data[:4] != _FILE_MAGIC:
+            raise ValueError(f"{path} is not a saved PerfectHashIndex")
+        _, n, part_size, seed, has_values, dtype = _FILE_HEADER.unpack_from(data, 0)
+
+        pos = _FILE_HEADER.size
+        g_size = math.ceil(3 * part_size / 4)
+        num_blocks = math.ceil((3 * part_size + 1) / BLOCK)
+        g = memoryview(data)[pos:pos + g_size]
+        pos += g_size
+        ranks = np.frombuffer(data, dtype="<u4", count=num_blocks, offset=pos)
+        pos += ranks.nbytes
+        values = None
+        if has_values:
+            values = np.frombuffer(data, dtype=np.dtype(dtype.rstrip(b"\0").decode()), count=n, offset=pos)
+        return cls(g, ranks, n, part_size, seed, values)
@@ -0,0 +1,76 @@
+"""Binary protocol of the membership server (structures.server).
+
+Every request is a fixed header followed by the key:
+    request_id (uint32), op (uint8), structure (uint16), key_type (uint8),
+    key_length (uint32), key bytes
+and is answered by a fixed response:
+    request_id (uint32), status (uint8), value (uint16)
+All integers are little-endian. Responses carry the request_id they answer
+and may arrive out of order, so a connection can pipeline any number of
+requests. Keys are at most MAX_KEY_LENGTH bytes: the server answers a longer
+request with STATUS_KEY_TOO_LONG, without reading its key, and closes the
+connection.
+
+- OP_LOOKUP: key is a structure name (UTF-8); value is its structure id.
+- OP_CONTAINS: value is 1 if the key is (possibly) in the structure.
+- OP_ADD: value is 1 if the key was stored (insert() can fail in a cuckoo table).
+  Structures served read-only answer STATUS_READ_ONLY.
+
+Keys keep their type across the wire (bytes, str or int) so they hash and
+compare on the server exactly as they would locally.
+"""
+import struct
+from typing import Tuple, Union
+import numpy as np
+
+REQUEST = struct.Struct("<IBHBI")
+RESPONSE = struct.Struct("<IBH")
+
+OP_LOOKUP, OP_CONTAINS, OP_ADD = 0, 1, 2
+KEY_BYTES, KEY_STR, KEY_INT = 0, 1, 2
+MAX_KEY_LENGTH = 1 << 16
+
+STATUS_OK = 0
+STATUS_UNKNOWN_STRUCTURE = 1
+STATUS_UNKNOWN_OP = 2
+STATUS_BAD_KEY = 3
+STATUS_FAILED = 4
+STATUS_READ_ONLY = 5
+STATUS_KEY_TOO_LONG = 6
+
+ERRORS = {
+    STATUS_UNKNOWN_STRUCTURE: "unknown structure",
+    STATUS_UNKNOWN_OP: "unknown operation",
+    STATUS_BAD_KEY: "key cannot be decoded",
+    STATUS_FAILED: "operation failed on the server",
+    STATUS_READ_ONLY: "structure is read-only",
+    STATUS_KEY_TOO_LONG: f"key is longer than {MAX_KEY_LENGTH} bytes",
+}
+
+
+def encode_key(key: Union[bytes, str, int]) -> Tuple[int, bytes]:
+    if isinstance(key, (bytes, bytearray, memoryview)):
+        return KEY_BYTES, bytes(key)
+    if isinstance(key, str):
+        return KEY_STR, key.encode()
+    if isinstance(key, (int, np.integer)) and not isinstance(key, (bool, np.bool_)):
+        key = int(key)
+        return KEY_INT, key.to_bytes((key.bit_length() + 8) // 8, byteorder="little", signed=True)
+    raise TypeError(f"cannot send key of type {type(key).__name__}; only bytes, str and int keys are supported")
+
+
+def decode_key(key_type: int, data: bytes) -> Union[bytes, str, int]:
+    if key_type == KEY_BYTES:
+        return data
+    if key_type == KEY_STR:
+        return data.decode()
+    if key_type == KEY_INT:
+        return int.from_bytes(data, byteorder="little", signed=True)
+    raise ValueError(f"unknown key type {key_type}")
+
+
+def encode_request(request_id: int, op: int, structure: int, key) -> bytes:
+    key_type, data = encode_key(key)
+    if len(data) > MAX_KEY_LENGTH:
+        raise ValueError(f"key of {len(data)} bytes is longer than {MAX_KEY_LENGTH} bytes")
+    return REQUEST.pack(request_id, op, structure, key_type, len(data)) + data
@@ -0,0 +1,233 @@
+"""Asyncio membership-query server.
+
+Loads one or more structures once and answers contains/add requests for
+them over a Unix or TCP socket (protocol in structures.protocol), so several
+processes can share one copy. Cuckoo tables are memory-mapped read-only
+unless the server is started with --writable, which loads them into memory so
+they accept add requests.
+
+Requests are pipelined: a connection may send any number of them without
+waiting, and they are answered by request id. Requests for the same
+structure that arrive in the same event-loop iteration (from one pipelined
+connection or from many connections) are queued in arrival order, and every
+run of consecutive requests with the same operation is answered as one batch
+with contains_many()/add_many() where the structure has them. A contains
+after an add of the same key therefore sees the add.
+
+Usage:
+    python -m structures.server --bloom users=users.bf --cuckoo ids=ids.cuckoo --unix /tmp/membership.sock
+    python -m structures.server --bloom users=users.bf --cuckoo ids=ids.cuckoo --writable --port 7070
+"""
+import argparse
+import asyncio
+import os
+from functools import partial
+from itertools import groupby
+from operator import itemgetter
+from typing import Dict, List, Optional
+from structures.cuckoo_hashing import CuckooHashTable
+from structures.tabulated_bloom_filter import BloomFilter
+from structures.protocol import (REQUEST, RESPONSE, OP_LOOKUP, OP_CONTAINS, OP_ADD, STATUS_OK,
+                                 STATUS_UNKNOWN_STRUCTURE, STATUS_UNKNOWN_OP, STATUS_BAD_KEY,
+                                 STATUS_FAILED, STATUS_READ_ONLY, STATUS_KEY_TOO_LONG, MAX_KEY_LENGTH,
+                                 decode_key)
+
+MAX_BATCH = 4096
+HIGH_WATER = 1 << 20  # Buffered response bytes before a connection waits for the client
+
+
+class MembershipServer:
+    """
+    Serves the structures of a {name: structure} dict. Structures need
+    contains() and add() or insert(); contains_many()/add_many() are used for
+    batches when present. Adds to a structure whose read_only attribute is
+    true (a memory-mapped cuckoo table) are answered with STATUS_READ_ONLY.
+    - batch_delay: Seconds to wait for more requests before answering a
+      batch. 0 (default) only coalesces requests already received.
+    - max_batch: Requests that trigger a batch without waiting.
+    """
+    def __init__(self, structures: Dict[str, object], batch_delay: float = 0.0, max_batch: int = MAX_BATCH):
+        if not isinstance(max_batch, int) or max_batch <= 0:
+            raise TypeError("max_batch must be a positive integer")
+        self.names = list(structures)
+        self.structures = [structures[name] for name in self.names]
+        self.batch_delay = batch_delay
+        self.max_batch = max_batch
+        # structure -> [(writer, request_id, op, key)] in arrival order
+        self._pending: Dict[int, List[tuple]] = {}
+        self._flush_handle = None
+        self._server = None
+        self._requests = 0
+        self._batches = 0
+
+    async def start(self, path: Optional[str] = None, host: str = "127.0.0.1", port: int = 0):
+        """Listens on the Unix socket path if given, otherwise on host:port (0 picks a free port)."""
+        if path is not None:
+            self._server = await asyncio.start_unix_server(self._handle, path=path)
+        else:
+            self._server = await asyncio.start_server(self._handle, host, port)
+        return self
+
+    @property
+    def address(self):
+        return self._server.sockets[0].getsockname()
+
+    async def serve_forever(self) -> None:
+        await self._server.serve_forever()
+
+    async def close(self) -> None:
+        self._server.close()
+        await self._server.wait_closed()
+
+    def stats(self) -> dict:
+        return {
+            "structures": self.names,
+            "requests": self._requests,
+            "batches": self._batches,
+            "mean_batch_size": self._requests / self._batches if self._batches else 0.0,
+        }
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request_id, op, structure, key_type, key_length = REQUEST.unpack(
+                    await reader.readexactly(REQUEST.size))
+                if key_length > MAX_KEY_LENGTH:
+                    # The key is not read, so the stream cannot be resynchronised:
+                    # answer what is pending, then this request, and close
+                    self._flush()
+                    writer.write(RESPONSE.pack(request_id, STATUS_KEY_TOO_LONG, 0))
+                    await writer.drain()
+                    break
+                data = await reader.readexactly(key_length) if key_length else b""
+                self._submit(writer, request_id, op, structure, key_type, data)
+                if writer.transport.get_write_buffer_size() > HIGH_WATER:
+                    await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    def _submit(self, writer, request_id: int, op: int, structure: int, key_type: int, data: bytes) -> None:
+        try:
+            key = decode_key(key_type, data)
+        except (ValueError, UnicodeDecodeError):
+            writer.write(RESPONSE.pack(request_id, STATUS_BAD_KEY, 0))
+            return
+        if op == OP_LOOKUP:
+            if key in self.names:
+                writer.write(RESPONSE.pack(request_id, STATUS_OK, self.names.index(key)))
+            else:
+                writer.write(RESPONSE.pack(request_id, STATUS_UNKNOWN_STRUCTURE, 0))
+            return
+        if op not in (OP_CONTAINS, OP_ADD):
+            writer.write(RESPONSE.pack(request_id, STATUS_UNKNOWN_OP, 0))
+            return
+        if structure >= len(self.structures):
+            writer.write(RESPONSE.pack(request_id, STATUS_UNKNOWN_STRUCTURE, 0))
+            return
+
+        queue = self._pending.setdefault(structure, [])
+        queue.append((writer, request_id, op, key))
+        if len(queue) >= self.max_batch:
+            self._flush()
+        elif self._flush_handle is None:
+            loop = asyncio.get_running_loop()
+            if self.batch_delay > 0:
+                self._flush_handle = loop.call_later(self.batch_delay, self._flush)
+            else:
+                self._flush_handle = loop.call_soon(self._flush)
+
+    def _flush(self) -> None:
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+        pending, self._pending = self._pending, {}
+        for structure, queue in pending.items():
+            for op, run in groupby(queue, key=itemgetter(2)):
+                self._answer(self.structures[structure], op, list(run))
+
+    def _answer(self, structure, op: int, batch: List[tuple]) -> None:
+        keys = [key for _, _, _, key in batch]
+        if op == OP_ADD and getattr(structure, "read_only", False):
+            results, status = [0] * len(batch), STATUS_READ_ONLY
+        else:
+            try:
+                results = self._run(structure, op, keys)
+                status = STATUS_OK
+            except Exception:
+                results, status = [0] * len(batch), STATUS_FAILED
+        self._requests += len(batch)
+        self._batches += 1
+        for (writer, request_id, _, _), result in zip(batch, results):
+            if not writer.is_closing():
+                writer.write(RESPONSE.pack(request_id, status, int(result)))
+
+    @staticmethod
+    def _run(structure, op: int, keys: list) -> list:
+        if op == OP_CONTAINS:
+            if hasattr(structure, "contains_many"):
+                return structure.contains_many(keys).tolist()
+            return [structure.contains(key) for key in keys]
+        if hasattr(structure, "add_many"):
+            structure.add_many(keys)
+            return [True] * len(keys)
+        if hasattr(structure, "insert"):
+            return [structure.insert(key) for key in keys]
+        for key in keys:
+            structure.add(key)
+        return [True] * len(keys)
+
+
+def load_structures(blooms: List[str], cuckoos: List[str], writable: bool = False) -> Dict[str, object]:
+    """
+    Loads name=path specs: Bloom filters into memory, cuckoo tables
+    memory-mapped read-only, or into memory if writable.
+    """
+    load_cuckoo = partial(CuckooHashTable.load, mmap=not writable)
+    structures = {}
+    for specs, load in ((blooms, BloomFilter.load), (cuckoos, load_cuckoo)):
+        for spec in specs:
+            name, sep, path = spec.partition("=")
+            if not sep or not name or not path:
+                raise ValueError(f"expected name=path, got {spec!r}")
+            if name in structures:
+                raise ValueError(f"duplicate structure name {name!r}")
+            structures[name] = load(path)
+    return structures
+
+
+async def _serve(args) -> None:
+    structures = load_structures(args.bloom, args.cuckoo, args.writable)
+    server = MembershipServer(structures, args.batch_delay, args.max_batch)
+    await server.start(path=args.unix, host=args.host, port=args.port)
+    print(f"Serving {', '.join(server.names)} on {server.address}", flush=True)
+    await server.serve_forever()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m structures.server", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--bloom", action="append", default=[], metavar="NAME=PATH", help="BloomFilter saved with save()")
+    parser.add_argument("--cuckoo", action="append", default=[], metavar="NAME=PATH", help="CuckooHashTable saved with save()")
+    parser.add_argument("--writable", action="store_true",
+                        help="load cuckoo tables into memory so they accept add (default: memory-mapped read-only)")
+    parser.add_argument("--unix", help="Unix socket path (default: TCP)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=7070)
+    parser.add_argument("--batch-delay", type=float, default=0.0)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    args = parser.parse_args(argv)
+    if not args.bloom and not args.cuckoo:
+        parser.error("at least one --bloom or --cuckoo structure is required")
+    if args.unix and os.path.exists(args.unix):
+        os.unlink(args.unix)
+    try:
+        asyncio.run(_serve(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
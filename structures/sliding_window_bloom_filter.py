@@ -0,0 +1,136 @@
+"""Sliding-window Bloom filter for deduplicating a stream.
+
+The window is a ring of BloomFilter generations with the same seed, geometry
+and hash functions. New keys go to the current generation; rotating moves to
+the next generation of the ring, which holds the oldest keys, and clears it
+in place. A key is therefore remembered for between generations - 1 and
+generations rotation periods.
+
+Rotation happens every rotate_every seconds, every rotate_after inserts, or
+only when rotate() is called; any rotation restarts the rotate_every period. Since every generation uses the same hashes,
+a lookup hashes its keys once and probes the bits of every generation.
+"""
+import time
+from typing import Callable, Optional, Tuple
+import numpy as np
+from structures.tabulated_bloom_filter import BloomFilter
+from tabulation_hashes.families import Family
+
+
+class SlidingWindowBloomFilter:
+    """
+    - capacity: Keys expected per generation (max_size of each BloomFilter).
+    - max_tolerance: False positive tolerance of each generation.
+    - generations: Number of generations in the ring (at least 2).
+    - rotate_every: Seconds per generation, or None.
+    - rotate_after: Inserts per generation, or None.
+    - seed, family: As in BloomFilter, shared by every generation.
+    - clock: Time source for rotate_every (default: time.monotonic).
+    """
+    def __init__(self, capacity: int, max_tolerance: float = 0.01, generations: int = 2,
+                 rotate_every: Optional[float] = None, rotate_after: Optional[int] = None,
+                 seed: int = None, family: Family = "simple", clock: Callable[[], float] = time.monotonic):
+        if not isinstance(generations, int) or generations < 2:
+            raise TypeError("generations must be an integer >= 2")
+        if rotate_every is not None and (not isinstance(rotate_every, (int, float)) or rotate_every <= 0):
+            raise TypeError("rotate_every must be a positive number of seconds")
+        if rotate_after is not None and (not isinstance(rotate_after, int) or rotate_after <= 0):
+            raise TypeError("rotate_after must be a positive integer")
+
+        first = BloomFilter(max_size=capacity, max_tolerance=max_tolerance, seed=seed, family=family)
+        self._generations = [first] + [first.sibling() for _ in range(generations - 1)]
+        self._hashes = first
+        self._current = 0
+        self._inserted = 0
+        self.rotate_every = rotate_every
+        self.rotate_after = rotate_after
+        self._clock = clock
+        self._rotated_at = clock()
+        self._rotations = 0
+
+    @property
+    def generations(self) -> Tuple[BloomFilter, ...]:
+        """The generations from oldest to current."""
+        n = len(self._generations)
+        return tuple(self._generations[(self._current + 1 + i) % n] for i in range(n))
+
+    @property
+    def current(self) -> BloomFilter:
+        return self._generations[self._current]
+
+    @property
+    def rotations(self) -> int:
+        return self._rotations
+
+    @property
+    def size(self) -> int:
+        return sum(bf.size for bf in self._generations)
+
+    def rotate(self) -> "SlidingWindowBloomFilter":
+        """Starts a new generation, forgetting the keys of the oldest one."""
+        self._current = (self._current + 1) % len(self._generations)
+        self._generations[self._current].clear()
+        self._inserted = 0
+        self._rotations += 1
+        self._rotated_at = self._clock()
+        return self
+
+    def _expire(self) -> None:
+        if self.rotate_every is None:
+            return
+        elapsed = self._clock() - self._rotated_at
+        periods = int(elapsed // self.rotate_every)
+        if periods <= 0:
+            return
+        # Past a full ring every generation is expired; clearing them once is enough
+        started = self._rotated_at
+        for _ in range(min(periods, len(self._generations))):
+            self.rotate()
+        self._rotated_at = started + periods * self.rotate_every
+
+    def add(self, value) -> "SlidingWindowBloomFilter":
+        self._expire()
+        if self.rotate_after is not None and self._inserted >= self.rotate_after:
+            self.rotate()
+        self.current.add(value)
+        self._inserted += 1
+        return self
+
+    def add_many(self, values) -> "SlidingWindowBloomFilter":
+        """Adds a batch, rotating between slices of it as rotate_after requires."""
+        self._expire()
+        values = values if isinstance(values, np.ndarray) else list(values)
+        start = 0
+        while start < len(values):
+            if self.rotate_after is not None and self._inserted >= self.rotate_after:
+                self.rotate()
+            room = len(values) - start if self.rotate_after is None else self.rotate_after - self._inserted
+            batch = values[start:start + room]
+            self.current.add_many(batch)
+            self._inserted += len(batch)
+            start += len(batch)
+        return self
+
+    def contains(self, value) -> bool:
+        self._expire()
+        positions = self._hashes.positions(value)
+        return any(bf.contains_positions(positions) for bf in self._generations)
+
+    def contains_many(self, values) -> np.ndarray:
+        """Vectorized contains(): hashes once, probes every generation. Returns a bool array."""
+        self._expire()
+        positions = self._hashes.positions_many(values)
+        found = np.zeros(positions.shape[1], dtype=bool)
+        for bf in self._generations:
+            found |= bf.contains_positions_many(positions)
+        return found
+
+    def false_positive_probability(self) -> float:
+        """
+        Probability that a key outside the window is reported in it: one
+        minus the probability that no generation reports it.
+        """
+        miss = 1.0
+        for bf in self._generations:
+            miss *= 1 - bf.false_positive_probability()
+        return 1 - miss
@@ -1,6 +1,15 @@
 import math
-import random
-from tabulation_hashes.tabulation_hash import TabulationHash
+import secrets
+import struct
+import time
+import numpy as np
+from tabulation_hashes.codecs import MASK64, key_to_int, keys_to_array
+from tabulation_hashes.families import Family, family_name, make_hashers
+from structures.instrumentation import OperationStats
+
+_FILE_MAGIC = b"TBF1"
+# max_size, seed, num_bits, num_hashes, size, family name (empty if custom)
+_FILE_HEADER = struct.Struct(">4sQqQQQ8s")
 
 class BloomFilter:
     """
@@ -8,8 +17,13 @@ class BloomFilter:
 
     Generates the ideal amount of tabulation hash functions with different tables given
     a max tolerance to false positives and the amount of data to be added.
+
+    family selects the hash functions (see tabulation_hashes.families): the
+    name of a built-in family ("simple" by default), a hasher class or a
+    factory(seed). Hash i is seeded with seed + i.
     """
-    def __init__(self, max_size: int, max_tolerance: float = 0.01, seed: int = None):
+    def __init__(self, max_size: int, max_tolerance: float = 0.01, seed: int = None,
+                 family: Family = "simple"):
         if not isinstance(max_size, int) or max_size <= 0:
             raise TypeError(f"maxSize debe ser un entero positivo, recibido: {max_size}")
         try:
@@ -19,7 +33,7 @@ class BloomFilter:
         if tol <= 0 or tol >= 1:
             raise TypeError(f"tolerance debe cumplir 0 < t < 1, recibido: {max_tolerance}")
         if seed is None:
-            seed = random.getrandbits(32)
+            seed = secrets.randbits(32)
         if not isinstance(seed, int):
             raise TypeError(f"seed debe ser un entero, recibido: {seed}")
 
@@ -33,9 +47,11 @@ class BloomFilter:
         if self._num_bits > 1_000_000_000:
             raise MemoryError("Demasiada memoria requerida para el Bloom filter")
 
-        self._tabhashes = [TabulationHash(seed=self._seed + i) for i in range(self._num_hashes)]
+        self._family = family
+        self._tabhashes = make_hashers(family, self._seed, self._num_hashes)
         self._bits = bytearray(math.ceil(self._num_bits / 8))
         self._size = 0
+        self._stats = None
 
     # Helper methods
     def _bit_coords(self, index: int):
@@ -55,37 +71,150 @@ class BloomFilter:
         return old != self._bits[b]
 
     # Interface
-    def _to_bytes(self, value) -> bytes:
-        if isinstance(value, bytes):
-            return value
-        elif isinstance(value, str):
-            return value.encode('utf-8')
-        elif isinstance(value, int):
-            return value.to_bytes(8, byteorder='big', signed=True)
-        else:
-            return repr(value).encode('utf-8')
-
     def _key_positions(self, value):
-        b = self._to_bytes(value)
+        key = key_to_int(value) & MASK64
         for h in self._tabhashes:
-            yield h.hash(b) % self._num_bits
+            yield h.hash(key) % self._num_bits
+
+    def positions(self, value) -> list:
+        """Bit positions of value, one per hash function."""
+        return list(self._key_positions(value))
+
+    def positions_many(self, values) -> np.ndarray:
+        """(num_hashes, n) array with the bit positions of every value."""
+        keys = keys_to_array(values)
+        positions = np.empty((self._num_hashes, len(keys)), dtype=np.int64)
+        for i, h in enumerate(self._tabhashes):
+            positions[i] = h.hash_many(keys) % np.uint64(self._num_bits)
+        return positions
+
+    def contains_positions(self, positions) -> bool:
+        """
+        Whether every bit in positions is set. With positions() this lets
+        filters built with sibling() hash a key once and all probe it.
+        """
+        bits = self._bits
+        return all((bits[p >> 3] >> (p & 7)) & 1 for p in positions)
+
+    def contains_positions_many(self, positions: np.ndarray) -> np.ndarray:
+        """Vectorized contains_positions() over the columns of a positions_many() array."""
+        bits = np.frombuffer(self._bits, dtype=np.uint8)
+        return ((bits[positions >> 3] >> (positions & 7).astype(np.uint8)) & 1).all(axis=0)
 
     def add(self, value) -> "BloomFilter":
-        flipped = False
+        stats = self._stats
+        start = time.perf_counter() if stats is not None and stats.hook else 0.0
+        newly_set = 0
         for pos in self._key_positions(value):
             if self._write_bit(pos):
-                flipped = True
-        if flipped:
+                newly_set += 1
+        if newly_set:
             self._size += 1
+
+        if stats is not None:
+            stats.count("add")
+            stats.count("hash_calls", self._num_hashes)
+            stats.count("bit_writes", self._num_hashes)
+            stats.count("bits_newly_set", newly_set)
+            if stats.hook:
+                stats.observe("add", value, time.perf_counter() - start, bits_newly_set=newly_set)
         return self
 
     def contains(self, value) -> bool:
-        return all(self._read_bit(pos) for pos in self._key_positions(value))
+        stats = self._stats
+        start = time.perf_counter() if stats is not None and stats.hook else 0.0
+        reads = 0
+        found = True
+        for pos in self._key_positions(value):
+            reads += 1
+            if not self._read_bit(pos):
+                found = False
+                break
+
+        if stats is not None:
+            stats.count("contains")
+            stats.count("hash_calls", reads)
+            stats.count("bit_reads", reads)
+            if found:
+                stats.count("contains_positive")
+            elif reads < self._num_hashes:
+                stats.count("contains_short_circuited")
+            if stats.hook:
+                stats.observe("contains", value, time.perf_counter() - start, bit_reads=reads, found=found)
+        return found
+
+    def add_many(self, values) -> "BloomFilter":
+        """
+        Adds a batch of values with vectorized hashing. Integer NumPy arrays
+        are hashed directly; other iterables accept the same values as add().
+        size grows exactly as if the values were added one by one.
+        """
+        positions = self.positions_many(values)
+        if positions.shape[1] == 0:
+            return self
+        bits = np.frombuffer(self._bits, dtype=np.uint8)
+        byte_idx, bit_idx = positions >> 3, (positions & 7).astype(np.uint8)
+
+        # A value counts towards size if it is the first in the batch to set
+        # one of the bits that were still clear
+        was_clear = ((bits[byte_idx] >> bit_idx) & 1) == 0
+        flat = positions.T.ravel()
+        _, first = np.unique(flat, return_index=True)
+        first = first[was_clear.T.ravel()[first]]
+        flipped = len(np.unique(first // self._num_hashes))
+
+        np.bitwise_or.at(bits, byte_idx.ravel(), (np.uint8(1) << bit_idx).ravel())
+        self._size += flipped
+        if self._stats is not None:
+            self._stats.count("add", positions.shape[1])
+            self._stats.count("hash_calls", positions.size)
+            self._stats.count("bit_writes", positions.size)
+            self._stats.count("bits_newly_set", int(np.unique(flat[was_clear.T.ravel()]).size))
+        return self
+
+    def contains_many(self, values) -> np.ndarray:
+        """Vectorized contains(). Returns a boolean array."""
+        positions = self.positions_many(values)
+        found = self.contains_positions_many(positions)
+        if self._stats is not None:
+            self._stats.count("contains", positions.shape[1])
+            self._stats.count("hash_calls", positions.size)
+            self._stats.count("bit_reads", positions.size)
+            self._stats.count("contains_positive", int(found.sum()))
+        return found
+
+    def clear(self) -> "BloomFilter":
+        """Empties the filter in place, keeping its bit array, seed and hashes."""
+        np.frombuffer(self._bits, dtype=np.uint8)[:] = 0
+        self._size = 0
+        return self
+
+    def sibling(self) -> "BloomFilter":
+        """
+        A new empty filter with the same seed, geometry and family. It shares
+        this filter's hash functions instead of building them again, so both
+        give every key the same positions.
+        """
+        bf = self.__class__.__new__(self.__class__)
+        bf._max_size = self._max_size
+        bf._seed = self._seed
+        bf._num_bits = self._num_bits
+        bf._num_hashes = self._num_hashes
+        bf._family = self._family
+        bf._tabhashes = self._tabhashes
+        bf._bits = bytearray(len(self._bits))
+        bf._size = 0
+        bf._stats = None
+        return bf
 
     @property
     def size(self) -> int:
         return self._size
 
+    @property
+    def seed(self) -> int:
+        return self._seed
+
     def false_positive_probability(self) -> float:
         k, n, m = self._num_hashes, self._size, self._num_bits
         return (1 - math.exp(-k * n / m))**k
@@ -96,3 +225,103 @@ class BloomFilter:
     @property
     def max_remaining_capacity(self) -> int:
         return max(0, self._max_size - self._size)
+
+    @property
+    def num_bits(self) -> int:
+        return self._num_bits
+
+    @property
+    def num_hashes(self) -> int:
+        return self._num_hashes
+
+    @property
+    def bits(self) -> bytes:
+        """Read-only copy of the bit array (bit i is bit i % 8 of byte i // 8)."""
+        return bytes(self._bits)
+
+    def bits_set(self) -> int:
+        return int(np.unpackbits(np.frombuffer(self._bits, dtype=np.uint8)).sum())
+
+    def fill_ratio(self) -> float:
+        return self.bits_set() / self._num_bits
+
+    @property
+    def family(self) -> Family:
+        return self._family
+
+    # Persistence
+    def save(self, path) -> None:
+        """
+        Writes the filter (seed, geometry, size, hasher family and bit array)
+        to path. A custom family is not stored: pass it again to load().
+        """
+        name = family_name(self._family) or ""
+        with open(path, "wb") as f:
+            f.write(_FILE_HEADER.pack(_FILE_MAGIC, self._max_size, self._seed,
+                                      self._num_bits, self._num_hashes, self._size, name.encode()))
+            f.write(self._bits)
+
+    @classmethod
+    def load(cls, path, family: Family = None) -> "BloomFilter":
+        """
+        Reads a filter written by save(). family is only needed (and then
+        required) for filters saved with a custom family.
+        """
+        with open(path, "rb") as f:
+            header = f.read(_FILE_HEADER.size)
+            if len(header) < _FILE_HEADER.size or header[:4] != _FILE_MAGIC:
+                raise ValueError(f"{path} is not a saved BloomFilter")
+            _, max_size, seed, num_bits, num_hashes, size, saved = _FILE_HEADER.unpack(header)
+            saved = saved.rstrip(b"\0").decode()
+            bits = bytearray(f.read())
+        if len(bits) != math.ceil(num_bits / 8):
+            raise ValueError(f"{path} is truncated: expected {math.ceil(num_bits / 8)} bytes of bits")
+
+        bf = cls.__new__(cls)
+        bf._max_size = max_size
+        bf._seed = seed
+        bf._num_bits = num_bits
+        bf._num_hashes = num_hashes
+        if family is None:
+            if not saved:
+                raise ValueError(f"{path} was saved with a custom hasher family; pass it as family")
+            family = saved
+        elif saved and family_name(family) != saved:
+            raise ValueError(f"{path} was saved with the {saved!r} family, not {family!r}")
+        bf._family = family
+        bf._tabhashes = make_hashers(family, seed, num_hashes)
+        bf._bits = bits
+        bf._size = size
+        bf._stats = None
+        return bf
+
+    # Instrumentation
+    def enable_stats(self, hook=None, slow_threshold: float = 0.0) -> "BloomFilter":
+        """
+        Starts counting add() and contains() calls. Without stats they only
+        pay one None check.
+        - hook: Optional callable receiving a dict for each slow operation.
+        - slow_threshold: Seconds an operation must take to reach the hook.
+        """
+        self._stats = OperationStats(hook, slow_threshold)
+        return self
+
+    def disable_stats(self) -> "BloomFilter":
+        self._stats = None
+        return self
+
+    def stats(self) -> dict:
+        """Snapshot of the filter state plus the operation counters, if enabled."""
+        bits_set = self.bits_set()
+        snap = {
+            "enabled": self._stats is not None,
+            "size": self._size,
+            "num_bits": self._num_bits,
+            "num_hashes": self._num_hashes,
+            "bits_set": bits_set,
+            "fill_ratio": bits_set / self._num_bits,
+            "false_positive_probability": self.false_positive_probability(),
+        }
+        if self._stats is not None:
+            snap.update(self._stats.snapshot())
+        return snap
@@ -1,5 +1,6 @@
 from .double_tabulation_hash import DoubleTabulationHash
+from .mixed_tabulation_hash import MixedTabulationHash
 from .tabulation_hash import TabulationHash
 from .twisted_tabulation_hash import TwistedTabulationHash
 
-__all__ = ["DoubleTabulationHash", "TabulationHash", "TwistedTabulationHash"]
+__all__ = ["DoubleTabulationHash", "MixedTabulationHash", "TabulationHash", "TwistedTabulationHash"]
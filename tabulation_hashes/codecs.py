@@ -0,0 +1,163 @@
+"""Key codecs shared by the hashes and the structures.
+
+A codec turns a key into the integer the tabulation hashes split into
+chunks. The hashes only ever read the low c*r bits of that integer, which for
+a bytes or str key are its last bytes, so only those bytes are converted
+(nbytes, 8 by default) instead of building a Python int as long as the key.
+
+Fast paths exist for int, bytes, bytearray, memoryview, str, float, tuples
+of supported keys and NumPy scalars. Other types can be registered with
+register_codec(); anything else falls back to its repr(), which is slow and
+only stable as long as repr() is.
+"""
+import struct
+from functools import lru_cache
+from typing import Any, Callable, Iterable, Union
+import numpy as np
+
+MASK64 = (1 << 64) - 1
+KEY_BYTES = 8
+RESOLVE_CACHE_SIZE = 256
+
+_DOUBLE = struct.Struct(">d")
+_FNV_OFFSET = 0xCBF29CE484222325
+_FNV_PRIME = 0x100000001B3
+
+
+def _int_codec(key: int, nbytes: int) -> int:
+    return key
+
+
+def _bytes_codec(key, nbytes: int) -> int:
+    return int.from_bytes(key[-nbytes:], byteorder='big')
+
+
+def _str_codec(key: str, nbytes: int) -> int:
+    # Every character takes at least one byte in UTF-8, so the last nbytes
+    # characters hold the last nbytes bytes of the whole encoding
+    return int.from_bytes(key[-nbytes:].encode()[-nbytes:], byteorder='big')
+
+
+def _float_codec(key: float, nbytes: int) -> int:
+    return int.from_bytes(_DOUBLE.pack(key), byteorder='big')
+
+
+def _tuple_codec(key: tuple, nbytes: int) -> int:
+    # FNV-1a over the 64-bit codes of the items, so every item reaches the
+    # low bits the hashes read
+    h = _FNV_OFFSET ^ len(key)
+    for item in key:
+        h = ((h ^ (key_to_int(item, KEY_BYTES) & MASK64)) * _FNV_PRIME) & MASK64
+    return h
+
+
+def _repr_codec(key: Any, nbytes: int) -> int:
+    return _str_codec(repr(key), nbytes)
+
+
+# Exact type -> codec for the built-in key types. Other types are resolved by
+# _resolve(), whose cache is bounded so that creating key types dynamically
+# does not grow it without limit.
+_CODECS = {
+    int: _int_codec,
+    bool: _int_codec,
+    bytes: _bytes_codec,
+    bytearray: _bytes_codec,
+    str: _str_codec,
+    float: _float_codec,
+    tuple: _tuple_codec,
+}
+_REGISTERED = {}
+
+
+def _memoryview_codec(key: memoryview, nbytes: int) -> int:
+    return int.from_bytes(key.cast("B")[-nbytes:], byteorder='big')
+
+
+_CODECS[memoryview] = _memoryview_codec
+
+# Checked in order for types without an exact entry
+_BASE_CODECS = [
+    (np.integer, lambda key, nbytes: int(key)),
+    (np.bool_, lambda key, nbytes: int(key)),
+    (np.floating, lambda key, nbytes: _float_codec(float(key), nbytes)),
+    (int, _int_codec),
+    (bytes, _bytes_codec),
+    (bytearray, _bytes_codec),
+    (str, _str_codec),
+    (float, _float_codec),
+    (tuple, _tuple_codec),
+]
+
+
+def register_codec(cls: type, encode: Callable[[Any], Union[int, bytes, str, tuple]]) -> None:
+    """
+    Registers how keys of type cls (and its subclasses) are encoded.
+    encode(key) must return a key with its own codec, usually int or bytes.
+    """
+    if not isinstance(cls, type):
+        raise TypeError(f"cls must be a type, got {cls!r}")
+    if not callable(encode):
+        raise TypeError("encode must be callable")
+    _REGISTERED[cls] = encode
+    # Built-in and cached resolutions may now resolve differently
+    for builtin in [t for t in _CODECS if issubclass(t, cls)]:
+        del _CODECS[builtin]
+    _resolve.cache_clear()
+
+
+@lru_cache(maxsize=RESOLVE_CACHE_SIZE)
+def _resolve(cls: type) -> Callable:
+    for base in cls.__mro__:
+        if base in _REGISTERED:
+            encode = _REGISTERED[base]
+            return lambda key, nbytes: key_to_int(encode(key), nbytes)
+    for base, codec in _BASE_CODECS:
+        if issubclass(cls, base):
+            return codec
+    return _repr_codec
+
+
+def key_to_int(key: Any, nbytes: int = KEY_BYTES) -> int:
+    """
+    Integer representation of key. For bytes and str keys, only the last
+    nbytes bytes are read, which is all a hash of at most 8*nbytes bits uses.
+    """
+    codec = _CODECS.get(type(key))
+    if codec is None:
+        codec = _resolve(type(key))
+    return codec(key, nbytes)
+
+
+def keys_to_array(keys: Union[np.ndarray, Iterable]) -> np.ndarray:
+    """
+    Converts a batch of keys to a uint64 array for vectorized hashing.
+    Integer and boolean arrays are used as they are (negative values wrap like
+    the scalar path, since only the low bits of a key are ever read), float
+    arrays by their IEEE 754 bits, and any other iterable key by key.
+    """
+    if isinstance(keys, np.ndarray):
+        if keys.dtype.kind in "iub":
+            return keys.astype(np.uint64, copy=False)
+        if keys.dtype.kind == "f":
+            return keys.astype(">f8").view(">u8").astype(np.uint64)
+    return np.fromiter((key_to_int(k) & MASK64 for k in keys), dtype=np.uint64)
+
+
+def bytes_to_array(buffer: np.ndarray, starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """
+    uint64 codes of the byte keys buffer[starts[i]:ends[i]], read straight
+    from the buffer without building the keys. Same as key_to_int() & MASK64.
+    """
+    lengths = ends - starts
+    codes = np.zeros(len(starts), dtype=np.uint64)
+    for j in range(KEY_BYTES):
+        present = lengths > j
+        byte = buffer[np.where(present, ends - 1 - j, 0)].astype(np.uint64)
+        codes |= np.where(present, byte << np.uint64(8 * j), np.uint64(0))
+    return codes
+
+
+def check_batch_width(c: int, r: int) -> None:
+    if c * r > 64:
+        raise ValueError(f"batch hashing supports keys of at most 64 bits, got c*r={c * r}")
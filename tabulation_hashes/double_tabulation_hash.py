@@ -1,5 +1,7 @@
 import random
-from typing import Union, List
+from typing import Iterable, Union, List
+import numpy as np
+from tabulation_hashes.codecs import key_to_int, keys_to_array, check_batch_width
 
 class DoubleTabulationHash:
     def __init__(self, c: int = 4, r: int = 8, seed: int = None):
@@ -13,26 +15,20 @@ class DoubleTabulationHash:
         self.r = r
         self.mask = (1 << r) - 1
         self.table_size = 1 << r
+        self._key_bytes = -(-c * r // 8)  # Bytes of a key the chunks can reach
 
-        random.seed(seed)
+        rng = random.Random(seed)
         # First layer: produces intermediate representation
         self.tables1 = [
-            [random.getrandbits(r) for _ in range(self.table_size)]
+            [rng.getrandbits(r) for _ in range(self.table_size)]
             for _ in range(c)
         ]
         # Second layer: final hash from intermediate representation
         self.tables2 = [
-            [random.getrandbits(32) for _ in range(self.table_size)]
+            [rng.getrandbits(32) for _ in range(self.table_size)]
             for _ in range(c)
         ]
-
-    def _to_int(self, key: Union[int, bytes, str]) -> int:
-        """Converts key to integer representation."""
-        if isinstance(key, str):
-            key = key.encode()
-        if isinstance(key, bytes):
-            key = int.from_bytes(key, byteorder='big')
-        return key if isinstance(key, int) else int(key)
+        self._np_tables = None
 
     def _chunked_key(self, key_int: int) -> List[int]:
         """Extracts 'c' chunks of 'r' bits from key_int."""
@@ -51,14 +47,30 @@ class DoubleTabulationHash:
 
     def hash(self, key: Union[int, bytes, str]) -> int:
         """Computes hash using double tabulation."""
-        key_int = self._to_int(key)
+        key_int = key_to_int(key, self._key_bytes)
         chunks = self._chunked_key(key_int)
         intermediate = self._intermediate_chunks(chunks)
         return self._final_hash(intermediate)
 
+    def hash_many(self, keys: Union[np.ndarray, Iterable]) -> np.ndarray:
+        """Hashes a batch of keys at once. Returns a uint64 array."""
+        if self._np_tables is None:
+            check_batch_width(self.c, self.r)
+            self._np_tables = (np.array(self.tables1, dtype=np.intp),
+                               np.array(self.tables2, dtype=np.uint64))
+        tables1, tables2 = self._np_tables
+        keys = keys_to_array(keys)
+        mask = np.uint64(self.mask)
+
+        h = np.zeros(keys.shape, dtype=np.uint64)
+        for i in range(self.c):
+            chunk = ((keys >> np.uint64(i * self.r)) & mask).astype(np.intp)
+            h ^= tables2[i][tables1[i][chunk]]
+        return h
+
     def debug_hash(self, key: Union[int, bytes, str]) -> dict:
         """Returns full step-by-step hash computation for debugging."""
-        key_int = self._to_int(key)
+        key_int = key_to_int(key, self._key_bytes)
         chunks = self._chunked_key(key_int)
         intermediate = self._intermediate_chunks(chunks)
         final = self._final_hash(intermediate)
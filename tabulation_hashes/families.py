@@ -0,0 +1,74 @@
+"""Hasher families the structures can be built with.
+
+A family is given as:
+- the name of a built-in family: "simple", "twisted", "double" or "mixed";
+- a hasher class, instantiated as cls(seed=seed);
+- a factory, called as factory(seed).
+
+Whatever it is, it must produce independent hashers for different seeds, and
+every hasher must implement the Hasher protocol. The structures never pass
+raw keys to a hasher, only their 64-bit codes, key_to_int(key) & MASK64 (see
+tabulation_hashes.codecs):
+- hash(code) receives one code as an int in [0, 2**64) and returns a
+  non-negative int;
+- hash_many(codes) receives the codes of a batch as a uint64 array and
+  returns the same values as hash() as a uint64 array.
+"""
+from typing import Any, Callable, Iterable, Optional, Protocol, Union, runtime_checkable
+import numpy as np
+from tabulation_hashes.tabulation_hash import TabulationHash
+from tabulation_hashes.twisted_tabulation_hash import TwistedTabulationHash
+from tabulation_hashes.double_tabulation_hash import DoubleTabulationHash
+from tabulation_hashes.mixed_tabulation_hash import MixedTabulationHash
+
+FAMILIES = {
+    "simple": TabulationHash,
+    "twisted": TwistedTabulationHash,
+    "double": DoubleTabulationHash,
+    "mixed": MixedTabulationHash,
+}
+
+
+@runtime_checkable
+class Hasher(Protocol):
+    """hash() gets one 64-bit key code as an int, hash_many() a uint64 array of them."""
+    def hash(self, key: Any) -> int: ...
+
+    def hash_many(self, keys: Union[np.ndarray, Iterable]) -> np.ndarray: ...
+
+
+Family = Union[str, type, Callable[[int], Hasher]]
+
+
+def hasher_factory(family: Family) -> Callable[[int], Hasher]:
+    """seed -> hasher function of family."""
+    if isinstance(family, str):
+        if family not in FAMILIES:
+            raise ValueError(f"family must be one of {tuple(FAMILIES)}, got {family!r}")
+        family = FAMILIES[family]
+    if isinstance(family, type):
+        cls = family
+        return lambda seed: cls(seed=seed)
+    if not callable(family):
+        raise TypeError(f"family must be a family name, a hasher class or a factory, got {family!r}")
+    return family
+
+
+def make_hashers(family: Family, seed: int, count: int) -> list:
+    """count hashers of family seeded seed, seed + 1, ..."""
+    factory = hasher_factory(family)
+    hashers = [factory(seed + i) for i in range(count)]
+    for h in hashers:
+        if not isinstance(h, Hasher):
+            raise TypeError(f"{type(h).__name__} does not implement hash() and hash_many()")
+    return hashers
+
+
+def family_name(family: Family) -> Optional[str]:
+    """Name of a built-in family (or of its class), None for anything else."""
+    if isinstance(family, str):
+        return family if family in FAMILIES else None
+    for name, cls in FAMILIES.items():
+        if family is cls:
+            return name
+    return None
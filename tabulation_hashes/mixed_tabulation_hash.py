@@ -0,0 +1,114 @@
+import random
+from typing import Callable, Iterable, Union
+import numpy as np
+from tabulation_hashes.codecs import key_to_int, keys_to_array, check_batch_width
+
+class MixedTabulationHash:
+    def __init__(self, c: int = 4, r: int = 8, d: int = 1, seed: int = None):
+        """
+        Mixed Tabulation Hashing:
+        - c: number of chunks (default: 4)
+        - r: bits per chunk (default: 8)
+        - d: number of derived characters (default: 1)
+        - seed: random seed for reproducibility
+
+        The first layer is simple tabulation over the c input chunks, but each
+        entry carries d extra "derived" characters in its high bits. These are
+        hashed once more with d small tables and mixed into the result, which
+        is much cheaper than a second full tabulation layer.
+        """
+        if not isinstance(d, int) or d <= 0:
+            raise TypeError("d must be a positive integer")
+
+        self.c = c
+        self.r = r
+        self.d = d
+        self.mask = (1 << r) - 1
+        self.table_size = 1 << r
+        self._key_bytes = -(-c * r // 8)  # Bytes of a key the chunks can reach
+
+        rng = random.Random(seed)
+        # c tables with 32 hash bits plus d*r derived-character bits per entry
+        self.tables = [
+            [rng.getrandbits(32 + d * r) for _ in range(self.table_size)]
+            for _ in range(c)
+        ]
+        # d tables to hash the derived characters
+        self.derived_tables = [
+            [rng.getrandbits(32) for _ in range(self.table_size)]
+            for _ in range(d)
+        ]
+        self._np_tables = None
+
+    def hash(self, key: Union[int, bytes, str]) -> int:
+        key_int = key_to_int(key, self._key_bytes)
+        r, mask = self.r, self.mask
+
+        # Simple tabulation over the input chunks
+        v = 0
+        for i, table in enumerate(self.tables):
+            v ^= table[(key_int >> (i * r)) & mask]
+
+        # Mix in the hashed derived characters, carried above the low 32 bits
+        h = v & 0xFFFFFFFF
+        derived = v >> 32
+        for table in self.derived_tables:
+            h ^= table[derived & mask]
+            derived >>= r
+        return h
+
+    def compile(self) -> Callable[[int], int]:
+        """
+        Returns a scalar hash specialised for integer keys.
+        The chunk loops are unrolled into a generated function with the tables
+        bound as its globals, so a call skips the key conversion and attribute
+        lookups of hash(). Results are identical to hash() for int keys.
+        """
+        r, mask = self.r, self.mask
+        chunk_terms = " ^ ".join(f"T{i}[(key >> {i * r}) & {mask}]" for i in range(self.c))
+        derived_terms = " ^ ".join(f"D{j}[(d >> {j * r}) & {mask}]" for j in range(self.d))
+        source = (
+            "def mixed_tabulation_hash(key):\n"
+            f"    v = {chunk_terms}\n"
+            "    d = v >> 32\n"
+            f"    return (v & 0xFFFFFFFF) ^ {derived_terms}\n"
+        )
+        namespace = {f"T{i}": table for i, table in enumerate(self.tables)}
+        namespace.update({f"D{j}": table for j, table in enumerate(self.derived_tables)})
+        exec(source, namespace)
+        return namespace["mixed_tabulation_hash"]
+
+    def _numpy_tables(self):
+        if self._np_tables is None:
+            check_batch_width(self.c, self.r)
+            if self.d * self.r > 64:
+                raise ValueError(f"batch hashing supports at most 64 derived bits, got d*r={self.d * self.r}")
+            low = np.array([[v & 0xFFFFFFFF for v in t] for t in self.tables], dtype=np.uint64)
+            derived = np.array([[v >> 32 for v in t] for t in self.tables], dtype=np.uint64)
+            second = np.array(self.derived_tables, dtype=np.uint64)
+            self._np_tables = (low, derived, second)
+        return self._np_tables
+
+    def hash_many(self, keys: Union[np.ndarray, Iterable]) -> np.ndarray:
+        """Hashes a batch of keys at once. Returns a uint64 array."""
+        low, derived, second = self._numpy_tables()
+        keys = keys_to_array(keys)
+        mask = np.uint64(self.mask)
+
+        h = np.zeros(keys.shape, dtype=np.uint64)
+        v = np.zeros(keys.shape, dtype=np.uint64)
+        for i in range(self.c):
+            chunk = ((keys >> np.uint64(i * self.r)) & mask).astype(np.intp)
+            h ^= low[i][chunk]
+            v ^= derived[i][chunk]
+
+        for j in range(self.d):
+            char = ((v >> np.uint64(j * self.r)) & mask).astype(np.intp)
+            h ^= second[j][char]
+        return h
+
+# Ejemplo simple
+if __name__ == "__main__":
+    hasher_mixed = MixedTabulationHash(seed=42)
+    print("Mixed hash of 123456789:", hasher_mixed.hash(123456789))
+    print("Mixed hash of 'hello':", hasher_mixed.hash("hello"))
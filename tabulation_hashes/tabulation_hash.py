@@ -1,5 +1,7 @@
 import random
-from typing import Union
+from typing import Iterable, Union
+import numpy as np
+from tabulation_hashes.codecs import key_to_int, keys_to_array, check_batch_width
 
 class TabulationHash:
     def __init__(self, c: int = 4, r: int = 8, seed: int = None):
@@ -13,23 +15,22 @@ class TabulationHash:
         self.r = r
         self.mask = (1 << r) - 1  # Bitmask for extracting r bits
         self.table_size = 1 << r  # 2^r entries per table
+        self._key_bytes = -(-c * r // 8)  # Bytes of a key the chunks can reach
         
-        random.seed(seed)
+        rng = random.Random(seed)
         # Initialize table
         # Create 32-bit random numbers for 2^r entries
         # One table per chunk: c tables in total
         self.tables = [
-            [random.getrandbits(32) for _ in range(self.table_size)]
+            [rng.getrandbits(32) for _ in range(self.table_size)]
             for _ in range(c)
         ]
+        self._np_tables = None
 
     def hash(self, key: Union[int, bytes, str]) -> int:
         """Hash an integer, bytes, or string."""
-        if isinstance(key, str):
-            key = key.encode()  # string -> bytes
-        if isinstance(key, bytes):
-            key = int.from_bytes(key, byteorder='big') # bytes -> int
-        
+        key = key_to_int(key, self._key_bytes)  # key -> int (see tabulation_hashes.codecs)
+
         h = 0
         for i in range(self.c):
             # Extract the i-th r-bit chunk
@@ -40,6 +41,20 @@ class TabulationHash:
             h ^= self.tables[i][chunk]
         return h
 
+    def hash_many(self, keys: Union[np.ndarray, Iterable]) -> np.ndarray:
+        """Hashes a batch of keys at once. Returns a uint64 array."""
+        if self._np_tables is None:
+            check_batch_width(self.c, self.r)
+            self._np_tables = np.array(self.tables, dtype=np.uint64)
+        keys = keys_to_array(keys)
+        mask = np.uint64(self.mask)
+
+        h = np.zeros(keys.shape, dtype=np.uint64)
+        for i in range(self.c):
+            chunk = ((keys >> np.uint64(i * self.r)) & mask).astype(np.intp)
+            h ^= self._np_tables[i][chunk]
+        return h
+
 if __name__ == "__main__":
     hasher = TabulationHash(seed=42)
     print(hasher.hash(123456789))  # Example: 1098894519
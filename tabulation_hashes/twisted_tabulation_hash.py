@@ -1,5 +1,7 @@
 import random
-from typing import Union, List
+from typing import Iterable, Union, List
+import numpy as np
+from tabulation_hashes.codecs import key_to_int, keys_to_array, check_batch_width
 
 class TwistedTabulationHash:
     def __init__(self, c: int = 4, r: int = 8, seed: int = None):
@@ -13,28 +15,23 @@ class TwistedTabulationHash:
         self.r = r
         self.mask = (1 << r) - 1
         self.table_size = 1 << r
+        self._key_bytes = -(-c * r // 8)  # Bytes of a key the chunks can reach
 
-        random.seed(seed)
+        rng = random.Random(seed)
         # Create c tables of 2^r entries with 32-bit values
         self.tables = [
-            [random.getrandbits(32) for _ in range(self.table_size)]
+            [rng.getrandbits(32) for _ in range(self.table_size)]
             for _ in range(c)
         ]
         # An additional "twister" table for the final XOR (used for dependency-breaking)
-        self.twister = [random.getrandbits(32) for _ in range(self.table_size)]
-
-    def _to_int(self, key: Union[int, bytes, str]) -> int:
-        if isinstance(key, str):
-            key = key.encode()
-        if isinstance(key, bytes):
-            key = int.from_bytes(key, byteorder='big')
-        return key if isinstance(key, int) else int(key)
+        self.twister = [rng.getrandbits(32) for _ in range(self.table_size)]
+        self._np_tables = None
 
     def _chunked_key(self, key_int: int) -> List[int]:
         return [(key_int >> (i * self.r)) & self.mask for i in range(self.c)]
 
     def hash(self, key: Union[int, bytes, str]) -> int:
-        key_int = self._to_int(key)
+        key_int = key_to_int(key, self._key_bytes)
         chunks = self._chunked_key(key_int)
 
         # Base: XOR of all table lookups
@@ -50,6 +47,25 @@ class TwistedTabulationHash:
 
         return h
 
+    def hash_many(self, keys: Union[np.ndarray, Iterable]) -> np.ndarray:
+        """Hashes a batch of keys at once. Returns a uint64 array."""
+        if self._np_tables is None:
+            check_batch_width(self.c, self.r)
+            self._np_tables = (np.array(self.tables, dtype=np.uint64),
+                               np.array(self.twister, dtype=np.uint64))
+        tables, twister = self._np_tables
+        keys = keys_to_array(keys)
+        mask = np.uint64(self.mask)
+
+        h = np.zeros(keys.shape, dtype=np.uint64)
+        twist_index = np.zeros(keys.shape, dtype=np.intp)
+        for i in range(self.c):
+            chunk = ((keys >> np.uint64(i * self.r)) & mask).astype(np.intp)
+            h ^= tables[i][chunk]
+            twist_index ^= chunk
+        h ^= twister[twist_index]
+        return h
+
 # Ejemplo simple
 if __name__ == "__main__":
     hasher_twisted = TwistedTabulationHash(seed=42)
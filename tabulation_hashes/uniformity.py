@@ -0,0 +1,136 @@
+"""Hash quality analysis for the tabulation hash families.
+
+Every run builds a hasher with its own seed, hashes a bulk set of random
+64-bit keys with the batch API and computes:
+- Pearson's chi-squared uniformity test over num_buckets buckets.
+- Bit bias: the largest deviation from 1/2 of the probability of any output
+  bit being set.
+- Avalanche: for every input bit, how often flipping it flips each output bit.
+  Ideally 1/2; the largest deviation and the mean deviation are reported.
+- Pairwise collisions: colliding pairs of hashes reduced to collision_range
+  values, compared with the C(n, 2) / collision_range pairs expected from a
+  truly random function.
+
+Runs are independent, so they are spread over a process pool and can be
+streamed to a CSV file as they finish.
+"""
+import csv
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Iterator, List, Optional
+import numpy as np
+from scipy.stats import chisquare
+
+NUM_RUNS = 100
+SAMPLE_SIZE = 100000
+NUM_BUCKETS = 1000
+AVALANCHE_SAMPLE = 10000
+COLLISION_RANGE = 1 << 20
+HASH_BITS = 32
+
+FIELDS = [
+    "family", "run", "seed", "chi2", "p_value", "max_bit_bias",
+    "avalanche_max_bias", "avalanche_mean_bias",
+    "collision_pairs", "expected_collision_pairs", "collision_ratio",
+]
+
+
+def generate_keys(n: int, seed: int) -> np.ndarray:
+    """n uniformly random 64-bit keys."""
+    rng = np.random.default_rng(seed)
+    return rng.integers(0, np.iinfo(np.uint64).max, size=n, dtype=np.uint64, endpoint=True)
+
+
+def _bit_matrix(values: np.ndarray, bits: int = HASH_BITS) -> np.ndarray:
+    """(n, bits) matrix with the low bits of each value, least significant first."""
+    shifts = np.arange(bits, dtype=np.uint64)
+    return ((values[:, None] >> shifts) & np.uint64(1)).astype(np.uint8)
+
+
+def chi_square(hashes: np.ndarray, num_buckets: int = NUM_BUCKETS):
+    counts = np.bincount((hashes % np.uint64(num_buckets)).astype(np.intp), minlength=num_buckets)
+    stat, p = chisquare(counts)
+    return float(stat), float(p)
+
+
+def bit_bias(hashes: np.ndarray) -> float:
+    return float(np.abs(_bit_matrix(hashes).mean(axis=0) - 0.5).max())
+
+
+def avalanche(hasher, keys: np.ndarray, in_bits: int):
+    """Largest and mean deviation from 1/2 of the output-bit flip probabilities."""
+    base = hasher.hash_many(keys)
+    flip_rates = np.empty((in_bits, HASH_BITS))
+    for bit in range(in_bits):
+        flipped = hasher.hash_many(keys ^ np.uint64(1 << bit))
+        flip_rates[bit] = _bit_matrix(base ^ flipped).mean(axis=0)
+    deviation = np.abs(flip_rates - 0.5)
+    return float(deviation.max()), float(deviation.mean())
+
+
+def pairwise_collisions(hashes: np.ndarray, collision_range: int = COLLISION_RANGE):
+    counts = np.bincount((hashes % np.uint64(collision_range)).astype(np.intp), minlength=collision_range)
+    observed = int((counts * (counts - 1) // 2).sum())
+    n = len(hashes)
+    expected = n * (n - 1) / 2 / collision_range
+    return observed, expected
+
+
+def analyze_run(hash_class, run: int, seed: int = 0, sample_size: int = SAMPLE_SIZE,
+                num_buckets: int = NUM_BUCKETS, avalanche_sample: int = AVALANCHE_SAMPLE,
+                collision_range: int = COLLISION_RANGE, family: Optional[str] = None) -> dict:
+    """All quality tests for one independently seeded hasher."""
+    run_seed = seed + run
+    hasher = hash_class(seed=run_seed)
+    keys = generate_keys(sample_size, run_seed)
+    hashes = hasher.hash_many(keys)
+
+    stat, p = chi_square(hashes, num_buckets)
+    max_bias, mean_bias = avalanche(hasher, keys[:avalanche_sample], min(hasher.c * hasher.r, 64))
+    observed, expected = pairwise_collisions(hashes, collision_range)
+    return {
+        "family": family or hash_class.__name__,
+        "run": run,
+        "seed": run_seed,
+        "chi2": stat,
+        "p_value": p,
+        "max_bit_bias": bit_bias(hashes),
+        "avalanche_max_bias": max_bias,
+        "avalanche_mean_bias": mean_bias,
+        "collision_pairs": observed,
+        "expected_collision_pairs": expected,
+        "collision_ratio": observed / expected,
+    }
+
+
+def iter_analysis(hash_class, runs: int = NUM_RUNS, workers: Optional[int] = None, **kwargs) -> Iterator[dict]:
+    """
+    Yields the result of every run in order. Runs go to a process pool
+    (workers=None uses every CPU); workers=1 runs them in this process.
+    """
+    task = partial(analyze_run, hash_class, **kwargs)
+    if workers == 1:
+        yield from map(task, range(runs))
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        yield from pool.map(task, range(runs))
+
+
+def run_analysis(hash_class, runs: int = NUM_RUNS, workers: Optional[int] = None,
+                 csv_path: Optional[str] = None, **kwargs) -> List[dict]:
+    """Runs the analysis, optionally streaming each row to csv_path as it finishes."""
+    results = []
+    if csv_path is None:
+        results.extend(iter_analysis(hash_class, runs, workers, **kwargs))
+        return results
+
+    os.makedirs(os.path.dirname(csv_path) or ".", exist_ok=True)
+    with open(csv_path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=FIELDS)
+        writer.writeheader()
+        for row in iter_analysis(hash_class, runs, workers, **kwargs):
+            writer.writerow(row)
+            f.flush()
+            results.append(row)
+    return results
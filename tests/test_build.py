@@ -0,0 +1,90 @@
+import io
+import struct
+import numpy as np
+import pytest
+from structures.build import iter_key_chunks, count_keys, build_bloom, build_cuckoo, main
+from structures.tabulated_bloom_filter import BloomFilter
+from structures.cuckoo_hashing import CuckooHashTable
+
+KEYS = [b"apple", b"banana", b"a-much-longer-key-than-the-window", b"x", b"cherry"]
+
+@pytest.fixture
+def lines_file(tmp_path):
+    path = tmp_path / "keys.txt"
+    path.write_bytes(b"\n".join(KEYS) + b"\n\n")
+    return path
+
+@pytest.fixture
+def length_file(tmp_path):
+    path = tmp_path / "keys.bin"
+    path.write_bytes(b"".join(struct.pack(">I", len(k)) + k for k in KEYS))
+    return path
+
+def read_all(source, fmt, chunk_bytes):
+    return [key for chunk in iter_key_chunks(source, fmt, chunk_bytes) for key in chunk.keys()]
+
+@pytest.mark.parametrize("chunk_bytes", [4, 16, 1 << 20])
+def test_lines_from_file_and_stream(lines_file, chunk_bytes):
+    assert read_all(str(lines_file), "lines", chunk_bytes) == KEYS
+    with open(lines_file, "rb") as f:
+        assert read_all(f, "lines", chunk_bytes) == KEYS
+
+@pytest.mark.parametrize("chunk_bytes", [4, 16, 1 << 20])
+def test_length_delimited_from_file_and_stream(length_file, chunk_bytes):
+    assert read_all(str(length_file), "length", chunk_bytes) == KEYS
+    with open(length_file, "rb") as f:
+        assert read_all(f, "length", chunk_bytes) == KEYS
+
+def test_truncated_length_delimited_input():
+    with pytest.raises(ValueError):
+        read_all(io.BytesIO(struct.pack(">I", 10) + b"short"), "length", 64)
+
+def test_last_line_without_newline():
+    assert read_all(io.BytesIO(b"a\nbc"), "lines", 64) == [b"a", b"bc"]
+
+def test_crlf_line_endings():
+    data = b"a\r\nbc\r\n\r\nd\r"
+    for chunk_bytes in (3, 64):
+        assert read_all(io.BytesIO(data), "lines", chunk_bytes) == [b"a", b"bc", b"d"]
+
+def test_empty_file(tmp_path):
+    path = tmp_path / "empty.txt"
+    path.write_bytes(b"")
+    assert count_keys(str(path)) == 0
+
+def test_int_keys_match_bytes_keys(lines_file):
+    chunks = list(iter_key_chunks(str(lines_file), "lines", 16))
+    ints = np.concatenate([chunk.int_keys() for chunk in chunks])
+    assert ints.tolist() == [int.from_bytes(k, "big") & (2**64 - 1) for k in KEYS]
+
+def test_build_bloom_matches_add(lines_file):
+    bf = build_bloom(iter_key_chunks(str(lines_file), "lines", 8), capacity=10, seed=3)
+    expected = BloomFilter(max_size=10, seed=3)
+    for key in KEYS:
+        expected.add(key)
+    assert bf.bits == expected.bits
+    assert all(bf.contains(key) for key in KEYS)
+
+def test_build_cuckoo(length_file):
+    table = build_cuckoo(iter_key_chunks(str(length_file), "length"), size=11)
+    assert table.size == 11
+    assert all(table.contains(key) for key in KEYS)
+
+def test_build_cuckoo_sizes_from_load_and_skips_duplicates():
+    table = build_cuckoo(iter_key_chunks(io.BytesIO(b"a\nb\na\nc\n"), "lines"), load=0.25)
+    assert table.occupancy() == 3
+    assert table.size == 6
+    with pytest.raises(ValueError):
+        build_cuckoo(iter_key_chunks(io.BytesIO(b"a\nb\nc\n"), "lines"), size=2)
+
+def test_cli_bloom_and_cuckoo(lines_file, tmp_path):
+    bloom_path = tmp_path / "keys.bf"
+    assert main(["bloom", str(lines_file), "-o", str(bloom_path), "--seed", "1", "--quiet"]) == 0
+    bf = BloomFilter.load(bloom_path)
+    assert bf.size == len(KEYS)
+    assert all(bf.contains(key) for key in KEYS)
+
+    cuckoo_path = tmp_path / "keys.cuckoo"
+    assert main(["cuckoo", str(lines_file), "-o", str(cuckoo_path), "--quiet"]) == 0
+    table = CuckooHashTable.load(cuckoo_path)
+    assert all(table.contains(key) for key in KEYS)
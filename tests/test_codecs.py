@@ -0,0 +1,75 @@
+import numpy as np
+import pytest
+from tabulation_hashes import TabulationHash, codecs
+from tabulation_hashes.codecs import MASK64, key_to_int, keys_to_array, bytes_to_array, register_codec
+
+def test_int_bytes_and_str_keep_their_meaning():
+    assert key_to_int(12345) == 12345
+    assert key_to_int(b"\x01\x02") == 0x0102
+    assert key_to_int("ab") == int.from_bytes(b"ab", "big")
+
+def test_long_keys_only_convert_their_last_bytes():
+    key = b"x" * 1000 + b"12345678"
+    assert key_to_int(key) == int.from_bytes(b"12345678", "big")
+    assert key_to_int(key, nbytes=4) == int.from_bytes(b"5678", "big")
+    text = "é" * 100 + "ü"
+    assert key_to_int(text) == int.from_bytes(text.encode()[-8:], "big")
+
+def test_hashes_ignore_bytes_beyond_their_width():
+    h = TabulationHash(seed=1)
+    assert h.hash("prefix-one-suffix") == h.hash(int.from_bytes(b"-one-suffix"[-4:], "big"))
+
+def test_numpy_scalars_match_python_values():
+    assert key_to_int(np.int64(-7)) == -7
+    assert key_to_int(np.uint32(7)) == 7
+    assert key_to_int(np.float64(1.5)) == key_to_int(1.5)
+    assert key_to_int(np.bytes_(b"abc")) == key_to_int(b"abc")
+    assert key_to_int(np.str_("abc")) == key_to_int("abc")
+
+def test_floats_are_not_truncated():
+    assert key_to_int(1.5) != key_to_int(1.0)
+
+def test_tuples_mix_every_item():
+    assert key_to_int((1, 2)) != key_to_int((2, 2))
+    assert key_to_int((1, 2)) != key_to_int((1, 3))
+    assert key_to_int((1, "a")) == key_to_int((1, "a"))
+    assert key_to_int(()) != key_to_int((0,))
+
+def test_register_codec_for_custom_type():
+    class UserId:
+        def __init__(self, value):
+            self.value = value
+
+    class AdminId(UserId):
+        pass
+
+    register_codec(UserId, lambda key: key.value)
+    assert key_to_int(UserId(42)) == 42
+    assert key_to_int(AdminId(43)) == 43
+
+    with pytest.raises(TypeError):
+        register_codec("UserId", str)
+
+def test_resolved_types_are_not_cached_without_bound():
+    sizes = set()
+    for i in range(2 * codecs.RESOLVE_CACHE_SIZE):
+        key_type = type(f"Key{i}", (bytes,), {})
+        assert key_to_int(key_type(b"abc")) == key_to_int(b"abc")
+        sizes.add(len(codecs._CODECS))
+    assert len(sizes) == 1
+    assert codecs._resolve.cache_info().currsize <= codecs.RESOLVE_CACHE_SIZE
+
+def test_unregistered_types_fall_back_to_repr():
+    assert key_to_int({"a": 1}) == key_to_int(repr({"a": 1}))
+
+def test_keys_to_array():
+    assert keys_to_array(np.array([-1, 2], dtype=np.int64)).tolist() == [MASK64, 2]
+    assert keys_to_array(np.array([1.5])).tolist() == [key_to_int(1.5)]
+    assert keys_to_array(["ab", b"cd", 3]).tolist() == [key_to_int("ab"), key_to_int(b"cd"), 3]
+
+def test_bytes_to_array_reads_keys_in_place():
+    keys = [b"a", b"abcdefghij", b"", b"xyz"]
+    buffer = np.frombuffer(b"".join(keys), dtype=np.uint8)
+    ends = np.cumsum([len(k) for k in keys])
+    starts = ends - [len(k) for k in keys]
+    assert bytes_to_array(buffer, starts, ends).tolist() == [key_to_int(k) & MASK64 for k in keys]
@@ -1,5 +1,8 @@
+import random
+import numpy as np
 import pytest
 from structures.cuckoo_hashing import CuckooHashTable
+from tabulation_hashes import TabulationHash
 
 def test_create_valid_cuckoo_table():
     table = CuckooHashTable(size=11, max_displacements=5)
@@ -57,3 +60,201 @@ def test_table_str_representation():
     assert "Tabla1" in s and "Tabla2" in s
     assert "x" in s or "None" in s 
 
+
+def test_positions_and_load_factor():
+    table = CuckooHashTable(size=11)
+    p1, p2 = table.positions("hello")
+    assert 0 <= p1 < 11 and 0 <= p2 < 11
+    table.insert("hello")
+    assert table.occupancy() == 1
+    assert table.load_factor() == 1 / 22
+
+def test_stats_disabled_by_default():
+    table = CuckooHashTable(size=11)
+    table.insert(1)
+    stats = table.stats()
+    assert not stats["enabled"]
+    assert "insert" not in stats
+    assert stats["occupied"] == 1
+
+def test_stats_count_evictions_and_failures():
+    table = CuckooHashTable(size=3, max_displacements=5).enable_stats()
+    results = [table.insert(k) for k in [1, 2, 3, 4, 5, 6, 7]]
+    stats = table.stats()
+    assert stats["insert"] == 7
+    assert stats["failed_inserts"] == results.count(False)
+    assert sum(stats["eviction_chain_lengths"].values()) == 7
+    assert stats["evictions"] == sum(length * count for length, count in stats["eviction_chain_lengths"].items())
+
+def test_stats_hook_and_disable():
+    events = []
+    table = CuckooHashTable(size=11).enable_stats(hook=events.append)
+    table.insert("x")
+    assert table.contains("x")
+    assert events[0]["op"] == "insert" and events[0]["success"]
+    assert events[1]["probes"] in (1, 2)
+    table.disable_stats()
+    assert table.contains("x")
+    assert len(events) == 2
+    assert "insert" not in table.stats()
+
+@pytest.mark.parametrize("keys", [
+    [15, 23, 37, -4, 2**62],
+    ["apple", b"banana", 2**80, -1],
+])
+def test_save_and_load_keep_slot_layout(tmp_path, keys):
+    table = CuckooHashTable(size=11, max_displacements=10)
+    for key in keys:
+        assert table.insert(key)
+    path = tmp_path / "table.cuckoo"
+    table.save(path)
+
+    for mmap in (True, False):
+        loaded = CuckooHashTable.load(path, mmap=mmap)
+        assert loaded.size == table.size
+        assert loaded.max_displacements == table.max_displacements
+        assert list(loaded.table1) == table.table1
+        assert list(loaded.table2) == table.table2
+        assert all(loaded.contains(key) for key in keys)
+        assert not loaded.contains("missing")
+        assert loaded.read_only == mmap
+
+@pytest.mark.parametrize("extra", [None, "apple"])
+def test_save_and_load_numpy_integer_keys(tmp_path, extra):
+    table = CuckooHashTable(size=11, seed=1)
+    keys = [np.int64(5), np.uint32(7), np.int8(-3)]
+    for key in keys:
+        assert table.insert(key)
+    if extra is not None:
+        table.insert(extra)
+    path = tmp_path / "table.cuckoo"
+    table.save(path)
+    loaded = CuckooHashTable.load(path)
+    assert all(loaded.contains(int(key)) for key in keys)
+    assert loaded.contains_many(np.array([5, 7, -3, 4], dtype=np.int64)).tolist() == [True, True, True, False]
+
+def test_mmap_arena_tables_are_views_of_the_file(tmp_path):
+    table = CuckooHashTable(size=11)
+    for key in ["apple", "banana", "cherry", b"date"]:
+        table.insert(key)
+    path = tmp_path / "table.cuckoo"
+    table.save(path)
+    loaded = CuckooHashTable.load(path)
+    assert not loaded.table2._offsets.flags.owndata
+    assert loaded.table2._arena is loaded.table1._arena
+    assert list(loaded.table2) == table.table2
+
+def test_mmap_loaded_table_is_read_only(tmp_path):
+    table = CuckooHashTable(size=11)
+    table.insert(1)
+    path = tmp_path / "table.cuckoo"
+    table.save(path)
+    loaded = CuckooHashTable.load(path)
+    with pytest.raises(TypeError, match="read-only"):
+        loaded.insert(2)
+    writable = CuckooHashTable.load(path, mmap=False)
+    assert writable.insert(2) and writable.contains(2)
+
+def test_save_rejects_unsupported_keys(tmp_path):
+    table = CuckooHashTable(size=11)
+    table.insert(1.5)
+    with pytest.raises(TypeError, match="cannot save key"):
+        table.save(tmp_path / "table.cuckoo")
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"definitely not a cuckoo table file")
+    with pytest.raises(ValueError):
+        CuckooHashTable.load(path)
+
+@pytest.mark.parametrize("load", [0.3, 0.48])
+def test_from_keys_places_every_key(load):
+    keys = np.random.default_rng(1).integers(-2**63, 2**63 - 1, size=20000, dtype=np.int64)
+    table = CuckooHashTable.from_keys(keys, load=load)
+    assert table.occupancy() == len(np.unique(keys))
+    assert all(table.contains(key) for key in keys.tolist())
+    assert table.contains_many(keys).all()
+
+def test_from_keys_matches_insert_positions_and_accepts_inserts():
+    keys = ["apple", "banana", "cherry", b"date", 7, 7]
+    table = CuckooHashTable.from_keys(keys, load=0.4)
+    assert table.occupancy() == 5
+    for key in keys:
+        assert table.table1[table.positions(key)[0]] == key or table.table2[table.positions(key)[1]] == key
+    assert table.insert("fig")
+    assert table.contains("fig")
+
+def test_from_keys_raises_when_keys_cannot_be_placed():
+    # Only the last 4 bytes reach the hashes, so the three keys share both slots
+    with pytest.raises(ValueError):
+        CuckooHashTable.from_keys(["a-tail", "b-tail", "c-tail"], max_attempts=3)
+    with pytest.raises(TypeError):
+        CuckooHashTable.from_keys([1, 2], load=0.9)
+
+def test_contains_many_matches_contains():
+    table = CuckooHashTable(size=101, max_displacements=50)
+    for key in ["apple", "banana", b"cherry", 3, 2**70]:
+        table.insert(key)
+    queries = ["apple", "xapple", "banana", b"cherry", "cherry", 3, 3.0, 2**70, 4]
+    assert table.contains_many(queries).tolist() == [table.contains(q) for q in queries]
+    assert table.insert("fig")
+    assert table.contains_many(["fig"]).tolist() == [True]
+
+def test_contains_many_accepts_generators():
+    table = CuckooHashTable.from_keys(range(5))
+    assert table.contains_many(iter(range(5))).tolist() == [True] * 5
+    assert table.contains_many(k for k in (3, 7)).tolist() == [True, False]
+
+def test_contains_many_on_int_arrays_and_mapped_tables(tmp_path):
+    keys = np.arange(0, 3000, 3, dtype=np.int64)
+    table = CuckooHashTable.from_keys(keys)
+    queries = np.arange(3000, dtype=np.int64)
+    expected = queries % 3 == 0
+    assert (table.contains_many(queries) == expected).all()
+    path = tmp_path / "table.cuckoo"
+    table.save(path)
+    assert (CuckooHashTable.load(path).contains_many(queries) == expected).all()
+
+@pytest.mark.parametrize("family", ["simple", "twisted", "double", "mixed"])
+def test_hasher_families_and_seeds(tmp_path, family):
+    table = CuckooHashTable(size=101, max_displacements=50, seed=7, family=family)
+    for key in [1, "two", b"three"]:
+        assert table.insert(key)
+    assert table.family == family
+    assert table.contains_many([1, "two", b"three", 4]).tolist() == [True, True, True, False]
+    path = tmp_path / "table.cuckoo"
+    table.save(path)
+    loaded = CuckooHashTable.load(path)
+    assert loaded.family == family
+    assert list(loaded.table1) == table.table1
+    assert all(loaded.contains(key) for key in [1, "two", b"three"])
+
+def test_seed_changes_positions():
+    keys = list(range(50))
+    first = CuckooHashTable(size=101, seed=1)
+    second = CuckooHashTable(size=101, seed=3)
+    assert [first.positions(k) for k in keys] != [second.positions(k) for k in keys]
+    assert CuckooHashTable(size=101, seed=1).positions(5) == first.positions(5)
+
+def test_default_seed_is_random():
+    keys = list(range(50))
+    random.seed(0)
+    first = CuckooHashTable(size=101)
+    random.seed(0)
+    second = CuckooHashTable(size=101)
+    assert [first.positions(k) for k in keys] != [second.positions(k) for k in keys]
+    table = CuckooHashTable.from_keys(keys)
+    assert all(table.contains(k) for k in keys)
+
+def test_custom_family_must_be_passed_to_load(tmp_path):
+    factory = lambda seed: TabulationHash(seed=seed + 100)
+    table = CuckooHashTable.from_keys([1, 2, 3], family=factory)
+    path = tmp_path / "table.cuckoo"
+    table.save(path)
+    with pytest.raises(ValueError):
+        CuckooHashTable.load(path)
+    assert CuckooHashTable.load(path, family=factory).contains_many([1, 2, 3]).all()
+
+def test_invalid_seed():
+    with pytest.raises(TypeError, match="seed must be an integer"):
+        CuckooHashTable(size=11, seed="one")
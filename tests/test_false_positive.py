@@ -0,0 +1,52 @@
+import csv
+from structures.false_positive import (
+    FIELDS, bloom_factory, cuckoo_factory, fresh_queries, run_trial, sweep, wilson_interval
+)
+import numpy as np
+
+def test_wilson_interval_contains_rate():
+    low, high = wilson_interval(50, 1000)
+    assert low < 0.05 < high
+    assert wilson_interval(0, 1000)[0] == 0.0
+    assert wilson_interval(0, 0) == (0.0, 1.0)
+
+def test_fresh_queries_exclude_inserted_keys():
+    rng = np.random.default_rng(1)
+    inserted = set(range(-5, 5))
+    queries = fresh_queries(rng, 1000, inserted)
+    assert len(queries) == 1000
+    assert not inserted & set(queries.tolist())
+
+def test_scalar_and_batch_modes_agree():
+    batch = run_trial(bloom_factory, 300, 0.05, seed=3, mode="batch", num_queries=2000, fill_steps=3)
+    scalar = run_trial(bloom_factory, 300, 0.05, seed=3, mode="scalar", num_queries=2000, fill_steps=3)
+    assert batch == scalar
+    assert [row["inserted"] for row in batch] == [100, 200, 300]
+
+def test_exact_structure_has_no_false_positives():
+    rows = run_trial(cuckoo_factory, 200, 0.01, seed=1, num_queries=1000, fill_steps=2)
+    assert all(row["false_positives"] == 0 for row in rows)
+
+def test_sweep_aggregates_seeds(tmp_path):
+    path = tmp_path / "fpr.csv"
+    rows = sweep({"bloom": bloom_factory}, capacities=[200], tolerances=[0.1, 0.01], seeds=range(3),
+                 num_queries=2000, fill_steps=1, workers=1, csv_path=str(path))
+    assert [row["tolerance"] for row in rows] == [0.1, 0.01]
+    assert all(row["seeds"] == 3 and row["queries"] == 6000 for row in rows)
+    assert rows[0]["empirical_fpr"] > rows[1]["empirical_fpr"]
+    for row in rows:
+        assert row["ci_low"] <= row["empirical_fpr"] <= row["ci_high"]
+    with open(path) as f:
+        assert list(csv.DictReader(f).fieldnames) == FIELDS
+
+def test_sweep_over_families():
+    rows = sweep({"bloom": bloom_factory, "cuckoo": cuckoo_factory}, capacities=[100],
+                 families=[None, "mixed"], seeds=range(2), num_queries=500, fill_steps=1, workers=1)
+    assert [(row["structure"], row["family"]) for row in rows] == [
+        ("bloom", "simple"), ("bloom", "mixed"), ("cuckoo", "twisted"), ("cuckoo", "mixed")]
+    assert all(row["false_positives"] == 0 for row in rows[2:])
+
+def test_sweep_in_process_pool():
+    rows = sweep({"bloom": bloom_factory}, capacities=[100], seeds=range(2), num_queries=500,
+                 fill_steps=1, workers=2)
+    assert rows[0]["seeds"] == 2
@@ -0,0 +1,58 @@
+import zlib
+import numpy as np
+import pytest
+from structures.cuckoo_hashing import CuckooHashTable
+from structures.tabulated_bloom_filter import BloomFilter
+from tabulation_hashes import MixedTabulationHash, TabulationHash
+from tabulation_hashes.families import FAMILIES, Hasher, family_name, hasher_factory, make_hashers
+
+def test_names_classes_and_factories():
+    assert isinstance(hasher_factory("mixed")(3), MixedTabulationHash)
+    assert isinstance(hasher_factory(TabulationHash)(3), TabulationHash)
+    assert hasher_factory(lambda seed: TabulationHash(c=2, seed=seed))(3).c == 2
+    assert all(isinstance(hasher_factory(name)(1), Hasher) for name in FAMILIES)
+
+def test_hashers_are_seeded_per_instance():
+    first, second = make_hashers("twisted", 10, 2)
+    assert first.hash(12345) != second.hash(12345)
+    assert make_hashers("twisted", 11, 1)[0].hash(12345) == second.hash(12345)
+
+def test_family_name():
+    assert family_name("double") == "double"
+    assert family_name(MixedTabulationHash) == "mixed"
+    assert family_name(lambda seed: TabulationHash(seed=seed)) is None
+
+def test_invalid_families():
+    with pytest.raises(ValueError):
+        hasher_factory("md5")
+    with pytest.raises(TypeError):
+        hasher_factory(42)
+    with pytest.raises(TypeError):
+        make_hashers(lambda seed: object(), 1, 1)
+
+class Crc32Hasher:
+    """A hasher that is not tabulation-based and reads the whole 64-bit code."""
+    def __init__(self, seed):
+        self.seed = seed & 0xFFFFFFFF
+
+    def hash(self, code):
+        return zlib.crc32(code.to_bytes(8, "little"), self.seed)
+
+    def hash_many(self, codes):
+        return np.array([self.hash(code) for code in codes.tolist()], dtype=np.uint64)
+
+KEYS = ["apple", b"banana", -4, 2**70, 12345, "a much longer key than eight bytes"]
+
+@pytest.mark.parametrize("family", [Crc32Hasher, lambda seed: TabulationHash(c=8, r=8, seed=seed)])
+def test_custom_hashers_see_the_same_codes_on_every_path(family):
+    table = CuckooHashTable(size=101, max_displacements=50, seed=3, family=family)
+    assert all(table.insert(key) for key in KEYS)
+    assert all(table.contains(key) for key in KEYS)
+    assert table.contains_many(KEYS).all()
+    assert CuckooHashTable.from_keys(KEYS, seed=3, family=family).contains_many(KEYS).all()
+
+    bf = BloomFilter(max_size=100, seed=3, family=family)
+    for key in KEYS:
+        bf.add(key)
+    assert bf.contains_many(KEYS).all()
+    assert bf.positions_many(KEYS).T.tolist() == [bf.positions(key) for key in KEYS]
@@ -0,0 +1,50 @@
+import random
+import numpy as np
+import pytest
+from tabulation_hashes import MixedTabulationHash
+
+def test_same_seed_same_hash():
+    h1 = MixedTabulationHash(seed=7)
+    h2 = MixedTabulationHash(seed=7)
+    assert h1.hash("hello") == h2.hash("hello")
+    assert h1.hash(123456789) == h2.hash(123456789)
+
+def test_hash_fits_in_32_bits():
+    h = MixedTabulationHash(d=3, seed=1)
+    for key in range(1000):
+        assert 0 <= h.hash(key) < 2**32
+
+def test_invalid_derived_characters():
+    with pytest.raises(TypeError, match="d must be a positive integer"):
+        MixedTabulationHash(d=0)
+    with pytest.raises(TypeError, match="d must be a positive integer"):
+        MixedTabulationHash(d="two")
+
+def test_derived_characters_change_hash():
+    keys = list(range(100))
+    one = MixedTabulationHash(d=1, seed=5)
+    two = MixedTabulationHash(d=2, seed=5)
+    assert [one.hash(k) for k in keys] != [two.hash(k) for k in keys]
+
+def test_compiled_matches_scalar():
+    h = MixedTabulationHash(d=2, seed=11)
+    fast = h.compile()
+    for key in [random.getrandbits(40) for _ in range(1000)]:
+        assert fast(key) == h.hash(key)
+
+def test_batch_matches_scalar():
+    h = MixedTabulationHash(d=2, seed=13)
+    keys = [random.getrandbits(64) for _ in range(1000)]
+    batch = h.hash_many(np.array(keys, dtype=np.uint64))
+    assert batch.dtype == np.uint64
+    assert batch.tolist() == [h.hash(k) for k in keys]
+
+def test_batch_accepts_mixed_key_types():
+    h = MixedTabulationHash(seed=17)
+    keys = ["apple", b"banana", 42, -3]
+    assert h.hash_many(keys).tolist() == [h.hash(k) for k in keys]
+
+def test_batch_rejects_keys_wider_than_64_bits():
+    h = MixedTabulationHash(c=9, seed=1)
+    with pytest.raises(ValueError):
+        h.hash_many([1, 2, 3])
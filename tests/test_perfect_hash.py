@@ -0,0 +1,67 @@
+import numpy as np
+import pytest
+from structures.perfect_hash import PerfectHashIndex
+
+def random_keys(n, seed=1):
+    rng = np.random.default_rng(seed)
+    return np.unique(rng.integers(np.iinfo(np.int64).min, np.iinfo(np.int64).max, size=n, dtype=np.int64))
+
+@pytest.mark.parametrize("n", [1, 2, 7, 5000])
+def test_index_is_a_bijection_onto_range(n):
+    keys = random_keys(n)
+    index = PerfectHashIndex.build(keys)
+    positions = index.index_many(keys)
+    assert sorted(positions.tolist()) == list(range(len(keys)))
+    assert [index.index(k) for k in keys.tolist()] == positions.tolist()
+
+def test_arrays_and_iterables_build_the_same_index():
+    keys = random_keys(300)
+    from_array = PerfectHashIndex.build(keys)
+    from_generator = PerfectHashIndex.build(k for k in keys.tolist())
+    assert from_array.index_many(keys).tolist() == from_generator.index_many(keys).tolist()
+
+def test_mixed_key_types_and_values():
+    keys = ["apple", "banana", b"cherry", 3.5, (1, "a"), -42]
+    index = PerfectHashIndex.build(keys, values=[10, 20, 30, 40, 50, 60])
+    assert [index.get(k) for k in keys] == [10, 20, 30, 40, 50, 60]
+    assert index.get_many(keys).tolist() == [10, 20, 30, 40, 50, 60]
+
+def test_size_is_a_few_bits_per_key():
+    index = PerfectHashIndex.build(random_keys(20000))
+    assert index.bits_per_key() < 3.5
+
+def test_rejects_duplicate_codes():
+    with pytest.raises(ValueError):
+        PerfectHashIndex.build([1, 2, 2])
+    # Only the last 8 bytes of a string reach the hash
+    with pytest.raises(ValueError):
+        PerfectHashIndex.build(["a-long-suffix", "b-long-suffix"])
+
+def test_invalid_arguments():
+    with pytest.raises(ValueError):
+        PerfectHashIndex.build([])
+    with pytest.raises(ValueError):
+        PerfectHashIndex.build([1, 2], values=[1])
+    with pytest.raises(TypeError):
+        PerfectHashIndex.build([1, 2], gamma=0.5)
+    with pytest.raises(ValueError):
+        PerfectHashIndex.build([1, 2]).get(1)
+
+@pytest.mark.parametrize("mmap", [True, False])
+def test_save_and_load(tmp_path, mmap):
+    keys = random_keys(3000)
+    values = np.arange(len(keys)) * 2
+    index = PerfectHashIndex.build(keys, values=values)
+    path = tmp_path / "keys.phf"
+    index.save(path)
+    loaded = PerfectHashIndex.load(path, mmap=mmap)
+    assert len(loaded) == len(keys)
+    assert (loaded.index_many(keys) == index.index_many(keys)).all()
+    assert loaded.get(int(keys[5])) == 10
+    assert (loaded.get_many(keys) == values).all()
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"not a perfect hash" * 4)
+    with pytest.raises(ValueError):
+        PerfectHashIndex.load(path)
@@ -0,0 +1,121 @@
+import asyncio
+import pytest
+from structures.client import MembershipClient
+from structures.cuckoo_hashing import CuckooHashTable
+from structures.protocol import (REQUEST, RESPONSE, OP_CONTAINS, KEY_BYTES, MAX_KEY_LENGTH,
+                                 STATUS_OK, STATUS_KEY_TOO_LONG, encode_request)
+from structures.server import MembershipServer, load_structures
+from structures.tabulated_bloom_filter import BloomFilter
+
+def make_structures(tmp_path):
+    bf = BloomFilter(max_size=1000, max_tolerance=0.01, seed=1)
+    bf.add_many(["alice", "bob"])
+    table = CuckooHashTable(size=101, max_displacements=50)
+    for key in [1, 2, b"three"]:
+        table.insert(key)
+    table.save(tmp_path / "ids.cuckoo")
+    return {"users": bf, "ids": table, "readonly": CuckooHashTable.load(tmp_path / "ids.cuckoo")}
+
+def run_with_server(structures, scenario, **client_args):
+    async def main():
+        server = await MembershipServer(structures).start(port=0)
+        try:
+            async with MembershipClient(port=server.address[1], **client_args) as client:
+                return await scenario(client), server.stats()
+        finally:
+            await server.close()
+    return asyncio.run(main())
+
+def test_contains_and_add_over_tcp(tmp_path):
+    async def scenario(client):
+        before = await client.contains("users", "carol")
+        added = await client.add("users", "carol")
+        return before, added, await client.contains("users", "carol"), await client.contains("ids", b"three")
+    result, _ = run_with_server(make_structures(tmp_path), scenario)
+    assert result == (False, True, True, True)
+
+def test_pipelined_requests_are_batched(tmp_path):
+    keys = [f"user-{i}" for i in range(500)]
+    async def scenario(client):
+        await client.add_many("users", keys[:250])
+        return await client.contains_many("users", keys)
+    found, stats = run_with_server(make_structures(tmp_path), scenario, pool_size=2)
+    assert all(found[:250])
+    assert sum(found[250:]) < 25
+    assert stats["requests"] == 750
+    assert stats["mean_batch_size"] > 10
+
+def test_pipelined_contains_sees_earlier_add(tmp_path):
+    async def scenario(client):
+        await client.structure_id("users")
+        return await asyncio.gather(client.contains("users", "dave"), client.add("users", "dave"),
+                                    client.contains("users", "dave"))
+    found, stats = run_with_server(make_structures(tmp_path), scenario, pool_size=1)
+    assert found == [False, True, True]
+    assert stats["batches"] == 3
+
+def test_concurrent_calls_keep_their_answers(tmp_path):
+    async def scenario(client):
+        return await asyncio.gather(*(client.contains("ids", key) for key in [1, 2, 3, b"three", "three"]))
+    found, _ = run_with_server(make_structures(tmp_path), scenario)
+    assert found == [True, True, False, True, False]
+
+def test_errors_are_reported(tmp_path):
+    async def scenario(client):
+        errors = []
+        for call in (client.contains("missing", 1), client.add("readonly", 5)):
+            try:
+                await call
+            except ValueError as exc:
+                errors.append(str(exc))
+        return errors, await client.contains("readonly", 1)
+    (errors, still_served), _ = run_with_server(make_structures(tmp_path), scenario)
+    assert errors == ["unknown structure", "structure is read-only"]
+    assert still_served
+
+def test_writable_cuckoo_tables_accept_add(tmp_path):
+    make_structures(tmp_path)
+    path = str(tmp_path / "ids.cuckoo")
+    assert load_structures([], [f"ids={path}"])["ids"].read_only
+    structures = load_structures([], [f"ids={path}"], writable=True)
+    async def scenario(client):
+        return await client.add("ids", 4), await client.contains("ids", 4)
+    result, _ = run_with_server(structures, scenario)
+    assert result == (True, True)
+
+def test_over_long_key_closes_connection_without_reading_it(tmp_path):
+    async def main():
+        server = await MembershipServer(make_structures(tmp_path)).start(port=0)
+        try:
+            reader, writer = await asyncio.open_connection("127.0.0.1", server.address[1])
+            writer.write(encode_request(1, OP_CONTAINS, 0, "alice"))
+            writer.write(REQUEST.pack(2, OP_CONTAINS, 0, KEY_BYTES, 0xFFFFFFFF))
+            await writer.drain()
+            responses = [RESPONSE.unpack(await reader.readexactly(RESPONSE.size)) for _ in range(2)]
+            closed = await reader.read() == b""
+            writer.close()
+            return responses, closed
+        finally:
+            await server.close()
+    responses, closed = asyncio.run(main())
+    assert responses == [(1, STATUS_OK, 1), (2, STATUS_KEY_TOO_LONG, 0)]
+    assert closed
+    with pytest.raises(ValueError):
+        encode_request(3, OP_CONTAINS, 0, b"x" * (MAX_KEY_LENGTH + 1))
+
+def test_unix_socket(tmp_path):
+    path = str(tmp_path / "membership.sock")
+    async def main():
+        server = await MembershipServer(make_structures(tmp_path)).start(path=path)
+        try:
+            async with MembershipClient(path=path, pool_size=1) as client:
+                return await client.contains("users", "alice")
+        finally:
+            await server.close()
+    assert asyncio.run(main())
+
+def test_client_rejects_invalid_arguments():
+    with pytest.raises(TypeError):
+        MembershipClient()
+    with pytest.raises(TypeError):
+        MembershipClient(port=1, pool_size=0)
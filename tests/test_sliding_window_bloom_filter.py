@@ -0,0 +1,87 @@
+import numpy as np
+import pytest
+from structures.sliding_window_bloom_filter import SlidingWindowBloomFilter
+from structures.tabulated_bloom_filter import BloomFilter
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+def test_clear_zeroes_bits_in_place():
+    bf = BloomFilter(max_size=100, seed=1).add_many(range(50))
+    buffer = bf._bits
+    bf.clear()
+    assert bf._bits is buffer
+    assert bf.bits_set() == 0 and bf.size == 0
+    assert not bf.contains(3)
+
+def test_rotation_by_insert_count_forgets_oldest_generation():
+    window = SlidingWindowBloomFilter(100, generations=3, rotate_after=10, seed=1)
+    window.add_many(range(25))
+    assert window.rotations == 2
+    assert [bf.size for bf in window.generations] == [10, 10, 5]
+    window.add_many(range(25, 40))
+    assert window.rotations == 3
+    assert not window.contains_many(range(10)).any()
+    assert window.contains_many(range(10, 40)).all()
+
+def test_add_matches_add_many():
+    one_by_one = SlidingWindowBloomFilter(100, rotate_after=7, seed=3)
+    for key in range(20):
+        one_by_one.add(key)
+    batched = SlidingWindowBloomFilter(100, rotate_after=7, seed=3).add_many(np.arange(20))
+    assert [bf.bits for bf in one_by_one.generations] == [bf.bits for bf in batched.generations]
+
+def test_rotation_by_time():
+    clock = FakeClock()
+    window = SlidingWindowBloomFilter(100, generations=2, rotate_every=10, seed=1, clock=clock)
+    window.add("a")
+    clock.now = 12
+    window.add("b")
+    assert window.contains("a") and window.contains("b")
+    clock.now = 21
+    assert not window.contains("a") and window.contains("b")
+    clock.now = 1000
+    assert not window.contains("b")
+    assert window.size == 0
+
+def test_count_rotation_restarts_time_period():
+    clock = FakeClock()
+    window = SlidingWindowBloomFilter(100, rotate_every=10, rotate_after=2, seed=1, clock=clock)
+    clock.now = 8
+    window.add_many(["a", "b", "c"])
+    assert window.rotations == 1
+    clock.now = 12
+    assert window.contains("a") and window.rotations == 1
+    clock.now = 18
+    assert window.contains("c") and window.rotations == 2
+
+def test_contains_matches_contains_many():
+    window = SlidingWindowBloomFilter(50, max_tolerance=0.1, generations=3, rotate_after=20, seed=9)
+    window.add_many(range(50))
+    queries = list(range(200))
+    assert window.contains_many(queries).tolist() == [window.contains(q) for q in queries]
+
+def test_generations_share_seed_and_geometry():
+    window = SlidingWindowBloomFilter(100, generations=4, family="mixed", seed=5)
+    first = window.generations[0]
+    assert all(bf.seed == 5 and bf.num_bits == first.num_bits and bf.family == "mixed"
+               for bf in window.generations)
+
+def test_window_false_positive_probability():
+    window = SlidingWindowBloomFilter(100, generations=2, rotate_after=50, seed=1)
+    assert window.false_positive_probability() == 0.0
+    window.add_many(range(100))
+    rates = [bf.false_positive_probability() for bf in window.generations]
+    assert window.false_positive_probability() == pytest.approx(1 - (1 - rates[0]) * (1 - rates[1]))
+
+def test_invalid_arguments():
+    with pytest.raises(TypeError):
+        SlidingWindowBloomFilter(100, generations=1)
+    with pytest.raises(TypeError):
+        SlidingWindowBloomFilter(100, rotate_every=0)
+    with pytest.raises(TypeError):
+        SlidingWindowBloomFilter(100, rotate_after=2.5)
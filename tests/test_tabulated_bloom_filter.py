@@ -1,5 +1,8 @@
+import random
 import pytest
+import numpy as np
 from structures.tabulated_bloom_filter import BloomFilter
+from tabulation_hashes import TabulationHash
 
 def test_bloom_filter_creation_valid():
     bf = BloomFilter(max_size=100, max_tolerance=0.01, seed=42)
@@ -69,3 +72,138 @@ def test_confidence_bounds():
         bf.add(i)
     conf = bf.confidence()
     assert 0 <= conf <= 1
+
+def test_stats_disabled_by_default():
+    bf = BloomFilter(max_size=100, seed=42)
+    bf.add("apple")
+    stats = bf.stats()
+    assert not stats["enabled"]
+    assert "add" not in stats
+    assert stats["bits_set"] == bf.bits_set() > 0
+    assert stats["fill_ratio"] == bf.fill_ratio()
+
+def test_stats_count_operations():
+    bf = BloomFilter(max_size=100, seed=42).enable_stats()
+    bf.add("apple")
+    bf.add("apple")
+    assert bf.contains("apple")
+    bf.contains("banana")
+    stats = bf.stats()
+    assert stats["add"] == 2
+    assert stats["contains"] == 2
+    assert stats["contains_positive"] == 1
+    assert stats["bits_newly_set"] == stats["bits_set"]
+    assert stats["bit_reads"] <= 2 * bf.num_hashes
+
+def test_disable_stats_stops_counting():
+    bf = BloomFilter(max_size=100, seed=42).enable_stats()
+    bf.add("pear")
+    bf.disable_stats()
+    bf.add("apple")
+    assert bf.contains("apple")
+    stats = bf.stats()
+    assert not stats["enabled"]
+    assert "add" not in stats and stats["size"] == 2
+
+def test_stats_hook_receives_slow_operations():
+    events = []
+    bf = BloomFilter(max_size=100, seed=42).enable_stats(hook=events.append)
+    bf.add("apple")
+    bf.contains("apple")
+    assert [e["op"] for e in events] == ["add", "contains"]
+    assert events[1]["found"]
+
+    quiet = BloomFilter(max_size=100, seed=42).enable_stats(hook=events.append, slow_threshold=60)
+    quiet.add("apple")
+    assert len(events) == 2
+
+def test_bits_is_a_copy():
+    bf = BloomFilter(max_size=100, seed=42)
+    bits = bf.bits
+    bf.add("apple")
+    assert bits != bf.bits
+    assert len(bf.bits) * 8 >= bf.num_bits
+
+def test_add_many_matches_add():
+    values = ["a", "b", b"c", 1, -2, 3, "a"]
+    one_by_one = BloomFilter(max_size=100, seed=42)
+    for v in values:
+        one_by_one.add(v)
+    batched = BloomFilter(max_size=100, seed=42).add_many(values)
+    assert batched.bits == one_by_one.bits
+    assert batched.size == one_by_one.size
+
+def test_add_many_with_numpy_keys():
+    keys = np.arange(-50, 50, dtype=np.int64)
+    bf = BloomFilter(max_size=100, seed=7).add_many(keys)
+    assert all(bf.contains(int(k)) for k in keys)
+
+def test_contains_many_matches_contains():
+    bf = BloomFilter(max_size=50, max_tolerance=0.1, seed=9).add_many(range(50))
+    queries = list(range(1000))
+    assert bf.contains_many(queries).tolist() == [bf.contains(q) for q in queries]
+    assert bf.contains_many([]).tolist() == []
+
+def test_save_and_load(tmp_path):
+    bf = BloomFilter(max_size=100, seed=42).add_many(["a", "b", "c"])
+    path = tmp_path / "filter.bf"
+    bf.save(path)
+    loaded = BloomFilter.load(path)
+    assert loaded.bits == bf.bits
+    assert loaded.size == bf.size
+    assert loaded.num_hashes == bf.num_hashes
+    assert all(loaded.contains(v) for v in ["a", "b", "c"])
+
+def test_load_rejects_other_files(tmp_path):
+    path = tmp_path / "other.bin"
+    path.write_bytes(b"not a filter")
+    with pytest.raises(ValueError):
+        BloomFilter.load(path)
+
+@pytest.mark.parametrize("family", ["simple", "twisted", "double", "mixed"])
+def test_hasher_families(tmp_path, family):
+    bf = BloomFilter(max_size=100, seed=5, family=family).add_many(["a", "b", 3])
+    assert bf.family == family
+    assert all(bf.contains(v) for v in ["a", "b", 3])
+    bf.save(tmp_path / "filter.bf")
+    loaded = BloomFilter.load(tmp_path / "filter.bf")
+    assert loaded.family == family
+    assert loaded.contains_many(["a", "b", 3]).all()
+
+def test_custom_family_must_be_passed_to_load(tmp_path):
+    factory = lambda seed: TabulationHash(seed=seed * 7)
+    bf = BloomFilter(max_size=100, seed=5, family=factory).add("a")
+    path = tmp_path / "filter.bf"
+    bf.save(path)
+    with pytest.raises(ValueError):
+        BloomFilter.load(path)
+    assert BloomFilter.load(path, family=factory).contains("a")
+
+def test_load_rejects_a_different_family(tmp_path):
+    path = tmp_path / "filter.bf"
+    BloomFilter(max_size=10, seed=1, family="twisted").save(path)
+    with pytest.raises(ValueError):
+        BloomFilter.load(path, family="mixed")
+
+def test_sibling_shares_hashes_not_bits():
+    bf = BloomFilter(max_size=100, seed=7, family="twisted").add_many(["a", "b"])
+    sibling = bf.sibling()
+    assert sibling.seed == 7 and sibling.family == "twisted" and sibling.num_bits == bf.num_bits
+    assert sibling.size == 0 and sibling.bits_set() == 0
+    assert sibling.positions("a") == bf.positions("a")
+    sibling.add("c")
+    assert not bf.contains("c")
+
+def test_contains_positions_match_contains():
+    bf = BloomFilter(max_size=100, seed=3).add_many(range(50))
+    queries = list(range(100))
+    expected = [bf.contains(q) for q in queries]
+    assert [bf.contains_positions(bf.positions(q)) for q in queries] == expected
+    assert bf.contains_positions_many(bf.positions_many(queries)).tolist() == expected
+
+def test_default_seed_does_not_depend_on_global_random():
+    BloomFilter(max_size=100, seed=5)
+    random.seed(0)
+    first = BloomFilter(max_size=100).seed
+    random.seed(0)
+    assert BloomFilter(max_size=100).seed != first
@@ -0,0 +1,31 @@
+import random
+import numpy as np
+import pytest
+from tabulation_hashes import TabulationHash, TwistedTabulationHash, DoubleTabulationHash, MixedTabulationHash
+
+FAMILIES = [TabulationHash, TwistedTabulationHash, DoubleTabulationHash, MixedTabulationHash]
+
+@pytest.mark.parametrize("hash_class", FAMILIES)
+def test_batch_matches_scalar(hash_class):
+    h = hash_class(seed=21)
+    keys = [random.getrandbits(64) for _ in range(1000)]
+    assert h.hash_many(np.array(keys, dtype=np.uint64)).tolist() == [h.hash(k) for k in keys]
+
+@pytest.mark.parametrize("hash_class", FAMILIES)
+def test_seeding_leaves_global_random_untouched(hash_class):
+    state = random.getstate()
+    first = hash_class(seed=5)
+    assert random.getstate() == state
+    assert hash_class(seed=5).hash(12345) == first.hash(12345)
+
+@pytest.mark.parametrize("hash_class", FAMILIES)
+def test_batch_accepts_any_key_iterable(hash_class):
+    h = hash_class(seed=22)
+    keys = ["apple", b"banana", 7]
+    assert h.hash_many(keys).tolist() == [h.hash(k) for k in keys]
+
+@pytest.mark.parametrize("hash_class", FAMILIES)
+def test_batch_of_signed_integers(hash_class):
+    h = hash_class(seed=23)
+    keys = np.array([-1, -2**40, 5], dtype=np.int64)
+    assert h.hash_many(keys).tolist() == [h.hash(int(k) & (2**64 - 1)) for k in keys]
@@ -0,0 +1,32 @@
+import csv
+from tabulation_hashes import TabulationHash, MixedTabulationHash
+from tabulation_hashes.uniformity import (
+    FIELDS, generate_keys, chi_square, pairwise_collisions, run_analysis
+)
+
+def test_generate_keys_is_reproducible():
+    assert (generate_keys(100, seed=3) == generate_keys(100, seed=3)).all()
+    assert (generate_keys(100, seed=3) != generate_keys(100, seed=4)).any()
+
+def test_chi_square_and_collisions_on_uniform_hashes():
+    hashes = TabulationHash(seed=1).hash_many(generate_keys(20000, seed=1))
+    stat, p = chi_square(hashes, num_buckets=100)
+    assert stat > 0 and 0 <= p <= 1
+    observed, expected = pairwise_collisions(hashes, collision_range=1 << 12)
+    assert 0.8 < observed / expected < 1.2
+
+def test_run_analysis_streams_rows_to_csv(tmp_path):
+    path = tmp_path / "mixed.csv"
+    results = run_analysis(MixedTabulationHash, runs=2, workers=1, csv_path=str(path),
+                           sample_size=2000, num_buckets=50, avalanche_sample=200, family="mixed")
+    assert [r["run"] for r in results] == [0, 1]
+    with open(path) as f:
+        rows = list(csv.DictReader(f))
+    assert list(rows[0].keys()) == FIELDS
+    assert [row["family"] for row in rows] == ["mixed", "mixed"]
+
+def test_run_analysis_in_process_pool():
+    results = run_analysis(TabulationHash, runs=2, workers=2, sample_size=2000,
+                           num_buckets=50, avalanche_sample=200)
+    assert [r["seed"] for r in results] == [0, 1]
+    assert all(0 <= r["max_bit_bias"] <= 0.5 for r in results)